@@ -0,0 +1,31 @@
+-- Store the small-domain string columns of hosh.results as LowCardinality.
+--
+-- status and checker_location only ever hold a handful of distinct values
+-- ('online'/'offline'/'error', IATA location codes), but every row stores and
+-- every scan decompresses them as full strings. LowCardinality keeps a
+-- dictionary per part and stores small integer indexes instead, which shrinks
+-- the columns on disk and speeds up the status filters in the uptime views and
+-- the web queries.
+--
+-- checker_module is left as String: it is part of the sorting key, and
+-- ClickHouse doesn't allow changing the type of key columns in place.
+--
+-- status is referenced by the idx_hostname_status skip index from
+-- 001_initial_schema.sql, and a column used by an index can't be modified
+-- (ALTER_OF_COLUMN_IS_FORBIDDEN). Drop the index around the type change, then
+-- re-add it and build it for the existing parts.
+
+ALTER TABLE hosh.results
+DROP INDEX IF EXISTS idx_hostname_status;
+
+ALTER TABLE hosh.results
+MODIFY COLUMN status LowCardinality(String);
+
+ALTER TABLE hosh.results
+ADD INDEX IF NOT EXISTS idx_hostname_status (hostname, status) TYPE minmax GRANULARITY 1;
+
+ALTER TABLE hosh.results
+MATERIALIZE INDEX idx_hostname_status;
+
+ALTER TABLE hosh.results
+MODIFY COLUMN checker_location LowCardinality(String);
@@ -1,11 +1,22 @@
 use nostr_sdk::prelude::*;
 use serde_json::Value;
 use std::env;
+use std::sync::LazyLock;
 use std::time::Duration;
 use tokio::signal;
 use chrono::Duration as ChronoDuration;
 use regex::Regex;
 
+// Patterns are compiled once and shared by every check round
+static TIME_REGEX: LazyLock<Regex> =
+    LazyLock::new(|| Regex::new(r"(\d+)d|(\d+)h|(\d+)m|(\d+)s").unwrap());
+
+// Matches table rows with server info. Columns: Server, Block Height, Status,
+// Uptime, Version, Last Checked, USA Ping
+static ROW_REGEX: LazyLock<Regex> = LazyLock::new(|| {
+    Regex::new(r#"<tr[^>]*>\s*<td><a[^>]*>([^<]+)</a></td>\s*<td[^>]*>[^<]*</td>\s*<td[^>]*>[^<]*</td>\s*<td[^>]*>[^<]*</td>\s*<td[^>]*>[^<]*</td>\s*<td>([^<]+)</td>\s*<td[^>]*>[^<]*</td>\s*</tr>"#).unwrap()
+});
+
 #[derive(Debug, Clone, PartialEq)]
 enum ApiHealth {
     Healthy,
@@ -65,9 +76,7 @@ fn parse_last_checked_time(time_str: &str) -> Option<ChronoDuration> {
     let mut total_seconds = 0i64;
     
     // Use regex to extract numbers before each time unit
-    let time_regex = Regex::new(r"(\d+)d|(\d+)h|(\d+)m|(\d+)s").unwrap();
-    
-    for cap in time_regex.captures_iter(time_str) {
+    for cap in TIME_REGEX.captures_iter(time_str) {
         if let Some(days) = cap.get(1) {
             if let Ok(d) = days.as_str().parse::<i64>() {
                 total_seconds += d * 24 * 60 * 60;
@@ -101,11 +110,7 @@ fn parse_last_checked_time(time_str: &str) -> Option<ChronoDuration> {
 fn parse_html_servers(html: &str) -> Result<Vec<HtmlServerInfo>, Box<dyn std::error::Error>> {
     let mut servers = Vec::new();
     
-    // Regex to match table rows with server info
-    // Updated to match the actual HTML structure: Server, Block Height, Status, Uptime, Version, Last Checked, USA Ping
-    let row_regex = Regex::new(r#"<tr[^>]*>\s*<td><a[^>]*>([^<]+)</a></td>\s*<td[^>]*>[^<]*</td>\s*<td[^>]*>[^<]*</td>\s*<td[^>]*>[^<]*</td>\s*<td[^>]*>[^<]*</td>\s*<td>([^<]+)</td>\s*<td[^>]*>[^<]*</td>\s*</tr>"#)?;
-    
-    for cap in row_regex.captures_iter(html) {
+    for cap in ROW_REGEX.captures_iter(html) {
         if cap.len() >= 3 {
             let last_checked = cap[2].trim().to_string();
             
@@ -244,6 +249,12 @@ async fn run_app() -> Result<(), Box<dyn std::error::Error>> {
     println!("Check interval: {} seconds", check_interval);
     println!("Max check age: {} minutes", max_check_age_minutes);
 
+    // One HTTP client for all status checks, so keep-alive connections to the
+    // monitored site are reused between check rounds
+    let http_client = reqwest::Client::builder()
+        .timeout(Duration::from_secs(10))
+        .build()?;
+
     // Create a client
     let client = Client::new(keys);
     
@@ -280,8 +291,8 @@ async fn run_app() -> Result<(), Box<dyn std::error::Error>> {
     // Monitoring loop with signal handling
     loop {
         // Check ZEC - both HTML (for stale checks) and JSON (for empty lists)
-        let zec_html_result = check_html_status(&zec_html_url).await;
-        let zec_json_result = check_json_status(&zec_api_url).await;
+        let zec_html_result = check_html_status(&http_client, &zec_html_url).await;
+        let zec_json_result = check_json_status(&http_client, &zec_api_url).await;
         
         let zec_current_state = match (&zec_html_result, &zec_json_result) {
             (Ok(html_servers), Ok(json_status)) => {
@@ -499,8 +510,8 @@ async fn run_app() -> Result<(), Box<dyn std::error::Error>> {
         }
 
         // Check BTC - both HTML (for stale checks) and JSON (for empty lists)
-        let btc_html_result = check_html_status(&btc_html_url).await;
-        let btc_json_result = check_json_status(&btc_api_url).await;
+        let btc_html_result = check_html_status(&http_client, &btc_html_url).await;
+        let btc_json_result = check_json_status(&http_client, &btc_api_url).await;
         
         let btc_current_state = match (&btc_html_result, &btc_json_result) {
             (Ok(html_servers), Ok(json_status)) => {
@@ -738,9 +749,8 @@ async fn run_app() -> Result<(), Box<dyn std::error::Error>> {
     }
 }
 
-async fn check_html_status(url: &str) -> Result<Vec<HtmlServerInfo>, Box<dyn std::error::Error>> {
-    let client = reqwest::Client::new();
-    let response = client.get(url).timeout(Duration::from_secs(10)).send().await?;
+async fn check_html_status(client: &reqwest::Client, url: &str) -> Result<Vec<HtmlServerInfo>, Box<dyn std::error::Error>> {
+    let response = client.get(url).send().await?;
     
     if !response.status().is_success() {
         return Err(format!("HTTP error: {}", response.status()).into());
@@ -750,9 +760,8 @@ async fn check_html_status(url: &str) -> Result<Vec<HtmlServerInfo>, Box<dyn std
     parse_html_servers(&html)
 }
 
-async fn check_json_status(url: &str) -> Result<ApiStatus, Box<dyn std::error::Error>> {
-    let client = reqwest::Client::new();
-    let response = client.get(url).timeout(Duration::from_secs(10)).send().await?;
+async fn check_json_status(client: &reqwest::Client, url: &str) -> Result<ApiStatus, Box<dyn std::error::Error>> {
+    let response = client.get(url).send().await?;
     
     if !response.status().is_success() {
         return Err(format!("HTTP error: {}", response.status()).into());
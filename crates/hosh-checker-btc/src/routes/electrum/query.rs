@@ -7,7 +7,7 @@ use chrono::{DateTime, Utc};
 use serde::Deserialize;
 use serde_json::json;
 use std::time::{Duration, UNIX_EPOCH};
-use tracing::{debug, error, info};
+use tracing::{debug, error, info, warn};
 
 #[derive(Deserialize)]
 pub struct QueryParams {
@@ -84,35 +84,57 @@ pub async fn electrum_query(
                 }
             })?;
 
-    let version = match tokio::time::timeout(
-        std::time::Duration::from_secs(5),
-        send_electrum_request(
-            &mut stream,
-            "server.version",
-            vec![json!("btc-backend"), json!(["1.4", "1.4.5"])],
-        ),
-    )
-    .await
-    {
-        Ok(Ok(response)) => {
-            info!("✅ Version response: {:?}", response);
-            response
-                .get("result")
-                .and_then(|v| v.as_array())
-                .and_then(|arr| arr.first())
-                .and_then(|v| v.as_str())
-                .unwrap_or("unknown")
-                .to_string()
-        }
-        Ok(Err(e)) => {
-            error!("Version request failed: {}", e);
-            "unknown".to_string()
+    // The DNS lookup for resolved_ips doesn't use the connection, so run it
+    // alongside the version request rather than after it
+    let version_request = async {
+        match tokio::time::timeout(
+            std::time::Duration::from_secs(5),
+            send_electrum_request(
+                &mut stream,
+                "server.version",
+                vec![json!("btc-backend"), json!(["1.4", "1.4.5"])],
+            ),
+        )
+        .await
+        {
+            Ok(Ok(response)) => {
+                info!("✅ Version response: {:?}", response);
+                response
+                    .get("result")
+                    .and_then(|v| v.as_array())
+                    .and_then(|arr| arr.first())
+                    .and_then(|v| v.as_str())
+                    .unwrap_or("unknown")
+                    .to_string()
+            }
+            Ok(Err(e)) => {
+                error!("Version request failed: {}", e);
+                "unknown".to_string()
+            }
+            Err(_) => {
+                error!("Version request timed out");
+                "unknown".to_string()
+            }
         }
-        Err(_) => {
-            error!("Version request timed out");
-            "unknown".to_string()
+    };
+    let resolve_ips = async {
+        if !host.ends_with(".onion") {
+            // Only attempt DNS lookup for non-.onion addresses
+            match tokio::net::lookup_host(format!("{}:{}", host, port)).await {
+                Ok(addrs) => addrs
+                    .map(|addr| addr.ip().to_string())
+                    .collect::<Vec<String>>(),
+                Err(e) => {
+                    warn!("Failed to resolve {}:{} - {}", host, port, e);
+                    vec![]
+                }
+            }
+        } else {
+            // Skip DNS lookup for .onion addresses
+            vec![]
         }
     };
+    let (version, resolved_ips) = tokio::join!(version_request, resolve_ips);
 
     let tls_version = match &stream {
         ElectrumStream::Ssl(ssl_stream) => ssl_stream.ssl().version_str().to_string(),
@@ -132,22 +154,6 @@ pub async fn electrum_query(
         "Plaintext"
     };
 
-    let resolved_ips = if !host.ends_with(".onion") {
-        // Only attempt DNS lookup for non-.onion addresses
-        match tokio::net::lookup_host(format!("{}:{}", host, port)).await {
-            Ok(addrs) => addrs
-                .map(|addr| addr.ip().to_string())
-                .collect::<Vec<String>>(),
-            Err(e) => {
-                eprintln!("Failed to resolve {}:{} - {}", host, port, e);
-                vec![]
-            }
-        }
-    } else {
-        // Skip DNS lookup for .onion addresses
-        vec![]
-    };
-
     let start_time = std::time::Instant::now(); // ✅ Start timing the request
 
     info!("✅ Connected successfully to {}:{}", host, port);
@@ -193,7 +199,7 @@ pub async fn electrum_query(
                         })));
                     }
                     Err(e) => {
-                        eprintln!("Failed to parse block header: {}", e);
+                        error!("Failed to parse block header: {}", e);
                         return Err(error_response(
                             &format!("Failed to parse block header for {}:{} - {}", host, port, e),
                             "parse_error",
@@ -1,3 +1,4 @@
+use openssl::error::ErrorStack;
 use openssl::ssl::{SslConnector, SslMethod, SslVerifyMode};
 use openssl::x509::X509StoreContextRef;
 use serde_json::json;
@@ -5,7 +6,7 @@ use std::env;
 use std::pin::Pin;
 use std::sync::{
     atomic::{AtomicBool, Ordering},
-    Arc,
+    Arc, LazyLock,
 };
 use std::time::Duration;
 use tokio::io::{AsyncReadExt, AsyncWriteExt};
@@ -15,6 +16,12 @@ use tokio_openssl::SslStream;
 use tokio_socks::tcp::Socks5Stream; // Tor support
 use tracing::{debug, error, info, warn};
 
+/// TLS context shared by every check. Building an `SslConnector` loads the
+/// system CA store, so it's done once; the verify callback that records
+/// self-signed certificates is installed on each connection instead.
+static SSL_CONNECTOR: LazyLock<Result<SslConnector, ErrorStack>> =
+    LazyLock::new(|| SslConnector::builder(SslMethod::tls()).map(|builder| builder.build()));
+
 pub enum ElectrumStream {
     Plain(TcpStream),
     Ssl(SslStream<TcpStream>),
@@ -80,16 +87,27 @@ pub async fn try_connect(host: &str, port: u16) -> Result<(Option<bool>, Electru
 
     debug!("Establishing SSL connection...");
 
-    let mut connector_builder = SslConnector::builder(SslMethod::tls()).map_err(|e| {
+    let connector = SSL_CONNECTOR.as_ref().map_err(|e| {
         error!("Failed to create OpenSSL connector: {:?}", e);
         format!("Failed to create OpenSSL connector: {:?}", e)
     })?;
 
+    let config = connector.configure().map_err(|e| {
+        error!("Failed to configure OpenSSL: {:?}", e);
+        format!("Failed to configure OpenSSL: {:?}", e)
+    })?;
+
+    let domain = host.to_string();
+    let mut ssl = config.into_ssl(&domain).map_err(|e| {
+        error!("Failed to create OpenSSL SSL object: {:?}", e);
+        format!("Failed to create OpenSSL SSL object: {:?}", e)
+    })?;
+
     // Track self-signed certificates
     let self_signed_flag = Arc::new(AtomicBool::new(false));
     let flag_clone = Arc::clone(&self_signed_flag);
 
-    connector_builder.set_verify_callback(
+    ssl.set_verify_callback(
         SslVerifyMode::PEER,
         move |valid, _ctx: &mut X509StoreContextRef| {
             if !valid {
@@ -101,18 +119,6 @@ pub async fn try_connect(host: &str, port: u16) -> Result<(Option<bool>, Electru
         },
     );
 
-    let connector = connector_builder.build();
-    let config = connector.configure().map_err(|e| {
-        error!("Failed to configure OpenSSL: {:?}", e);
-        format!("Failed to configure OpenSSL: {:?}", e)
-    })?;
-
-    let domain = host.to_string();
-    let mut ssl = config.into_ssl(&domain).map_err(|e| {
-        error!("Failed to create OpenSSL SSL object: {:?}", e);
-        format!("Failed to create OpenSSL SSL object: {:?}", e)
-    })?;
-
     ssl.set_connect_state();
 
     let mut ssl_stream = SslStream::new(ssl, stream).map_err(|e| {
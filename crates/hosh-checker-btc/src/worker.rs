@@ -57,6 +57,7 @@ struct ServerData {
 pub struct Worker {
     web_api_url: String,
     api_key: String,
+    results_url: String,
     max_concurrent_checks: usize,
     http_client: reqwest::Client,
     location: String,
@@ -97,9 +98,12 @@ impl Worker {
             .build()?;
         info!("✅ HTTP client created successfully");
 
+        let results_url = format!("{}/api/v1/results?api_key={}", web_api_url, api_key);
+
         Ok(Worker {
             web_api_url,
             api_key,
+            results_url,
             max_concurrent_checks,
             http_client,
             location: location.to_string(),
@@ -211,10 +215,7 @@ impl Worker {
 
         let response = self
             .http_client
-            .post(format!(
-                "{}/api/v1/results?api_key={}",
-                self.web_api_url, self.api_key
-            ))
+            .post(&self.results_url)
             .json(server_data)
             .send()
             .await?;
@@ -278,12 +279,13 @@ impl Worker {
             }
         });
 
+        let jobs_url = format!(
+            "{}/api/v1/jobs?api_key={}&checker_module=btc&limit={}",
+            self.web_api_url, self.api_key, self.max_concurrent_checks
+        );
+
         loop {
             info!("📡 Fetching jobs from web API...");
-            let jobs_url = format!(
-                "{}/api/v1/jobs?api_key={}&checker_module=btc&limit={}",
-                self.web_api_url, self.api_key, self.max_concurrent_checks
-            );
             match self.http_client.get(&jobs_url).send().await {
                 Ok(response) => {
                     if response.status().is_success() {
@@ -9,7 +9,7 @@ use serde::{Deserialize, Serialize};
 use std::time::Instant;
 use std::{env, error::Error, time::Duration};
 use tonic::{
-    transport::{ClientTlsConfig, Endpoint, Uri},
+    transport::{Channel, ClientTlsConfig, Endpoint, Uri},
     Request,
 };
 use tracing::{error, info};
@@ -95,29 +95,24 @@ struct ServerInfo {
 }
 
 // ClickhouseConfig removed - not used in current implementation
-// Results are submitted via Worker's submit_to_api method instead
+// Results are submitted in batches via Worker's submit_to_api method instead
 
 #[derive(Clone)]
 struct Worker {
     web_api_url: String,
     api_key: String,
+    results_url: String,
+    socks_proxy: Option<String>,
     http_client: reqwest::Client,
     location: String,
 }
 
-// Connect directly (without SOCKS proxy)
-async fn get_info_direct(uri: Uri) -> Result<ServerInfo, Box<dyn Error + Send + Sync>> {
-    info!("Connecting to lightwalletd server at {}", uri);
-
-    let endpoint = Endpoint::from(uri.clone())
-        .tls_config(ClientTlsConfig::new().with_webpki_roots())?
-        .connect_timeout(Duration::from_secs(5)) // dial timeout
-        .timeout(Duration::from_secs(15)); // per-RPC client-side timeout
-
-    info!("Establishing secure connection...");
-    let channel = endpoint.connect().await?;
-
-    let mut client = CompactTxStreamerClient::with_origin(channel, uri);
+// Ask a lightwalletd server for its chain info over an established channel
+async fn request_lightd_info(
+    channel: Channel,
+    origin: Uri,
+) -> Result<ServerInfo, Box<dyn Error + Send + Sync>> {
+    let mut client = CompactTxStreamerClient::with_origin(channel, origin);
 
     info!("Sending gRPC request for lightwalletd info...");
     let mut req = Request::new(Empty {});
@@ -135,7 +130,7 @@ async fn get_info_direct(uri: Uri) -> Result<ServerInfo, Box<dyn Error + Send +
     };
 
     info!("Processing server response...");
-    let info = ServerInfo {
+    Ok(ServerInfo {
         block_height: chain_info.block_height,
         vendor: chain_info.vendor,
         chain_name: chain_info.chain_name,
@@ -151,7 +146,22 @@ async fn get_info_direct(uri: Uri) -> Result<ServerInfo, Box<dyn Error + Send +
         zcashd_build: chain_info.zcashd_build,
         zcashd_subversion: chain_info.zcashd_subversion,
         donation_address: chain_info.donation_address,
-    };
+    })
+}
+
+// Connect directly (without SOCKS proxy)
+async fn get_info_direct(uri: Uri) -> Result<ServerInfo, Box<dyn Error + Send + Sync>> {
+    info!("Connecting to lightwalletd server at {}", uri);
+
+    let endpoint = Endpoint::from(uri.clone())
+        .tls_config(ClientTlsConfig::new().with_webpki_roots())?
+        .connect_timeout(Duration::from_secs(5)) // dial timeout
+        .timeout(Duration::from_secs(15)); // per-RPC client-side timeout
+
+    info!("Establishing secure connection...");
+    let channel = endpoint.connect().await?;
+
+    let info = request_lightd_info(channel, uri).await?;
 
     info!("Successfully gathered server info");
     Ok(info)
@@ -196,41 +206,7 @@ async fn get_info_via_socks(
     info!("Establishing connection through SOCKS proxy...");
     let channel = endpoint.connect_with_connector(connector).await?;
 
-    let mut client = CompactTxStreamerClient::with_origin(channel, connection_uri);
-
-    info!("Sending gRPC request for lightwalletd info...");
-    let mut req = Request::new(Empty {});
-    req.set_timeout(Duration::from_secs(10));
-
-    let chain_info = match client.get_lightd_info(req).await {
-        Ok(response) => {
-            info!("Received successful gRPC response via SOCKS");
-            response.into_inner()
-        }
-        Err(e) => {
-            error!("gRPC request failed: {}", e);
-            return Err(format!("gRPC error: {}", e).into());
-        }
-    };
-
-    info!("Processing server response...");
-    let info = ServerInfo {
-        block_height: chain_info.block_height,
-        vendor: chain_info.vendor,
-        chain_name: chain_info.chain_name,
-        git_commit: chain_info.git_commit,
-        sapling_activation_height: chain_info.sapling_activation_height,
-        consensus_branch_id: chain_info.consensus_branch_id,
-        taddr_support: chain_info.taddr_support,
-        branch: chain_info.branch,
-        build_date: chain_info.build_date,
-        build_user: chain_info.build_user,
-        estimated_height: chain_info.estimated_height,
-        version: chain_info.version,
-        zcashd_build: chain_info.zcashd_build,
-        zcashd_subversion: chain_info.zcashd_subversion,
-        donation_address: chain_info.donation_address,
-    };
+    let info = request_lightd_info(channel, connection_uri).await?;
 
     info!("Successfully gathered server info via SOCKS");
     Ok(info)
@@ -261,25 +237,28 @@ impl Worker {
             .tcp_keepalive(std::time::Duration::from_secs(60))
             .build()?;
 
+        let results_url = format!("{}/api/v1/results?api_key={}", web_api_url, api_key);
+        let socks_proxy = env::var("SOCKS_PROXY").ok();
+
         Ok(Worker {
             web_api_url,
             api_key,
+            results_url,
+            socks_proxy,
             http_client,
             location: location.to_string(),
         })
     }
 
+    /// Submit a poll's check results to the web API in a single request.
     async fn submit_to_api(
         &self,
-        result: &CheckResult,
+        results: &[CheckResult],
     ) -> Result<(), Box<dyn Error + Send + Sync>> {
         let response = self
             .http_client
-            .post(format!(
-                "{}/api/v1/results?api_key={}",
-                self.web_api_url, self.api_key
-            ))
-            .json(result)
+            .post(&self.results_url)
+            .json(results)
             .send()
             .await?;
 
@@ -288,24 +267,20 @@ impl Worker {
         }
 
         info!(
-            host = %result.host,
-            check_id = %result.check_id.as_deref().unwrap_or("none"),
-            "Successfully submitted check data to API"
+            "Successfully submitted {} check results to API",
+            results.len()
         );
 
         Ok(())
     }
 
-    async fn process_check(
-        &self,
-        check_request: CheckRequest,
-    ) -> Result<(), Box<dyn Error + Send + Sync>> {
+    async fn process_check(&self, check_request: CheckRequest) -> Option<CheckResult> {
         let uri: Uri =
             match format!("https://{}:{}", check_request.host, check_request.port).parse() {
                 Ok(u) => u,
                 Err(e) => {
                     error!("Invalid URI: {e}");
-                    return Ok(());
+                    return None;
                 }
             };
 
@@ -313,13 +288,12 @@ impl Worker {
 
         // Check if this is an .onion address
         let is_onion = check_request.host.ends_with(".onion");
-        let socks_proxy = env::var("SOCKS_PROXY").ok();
 
         let (height, error, server_info) = if is_onion {
             // .onion addresses require SOCKS proxy
-            if let Some(proxy) = socks_proxy {
+            if let Some(proxy) = &self.socks_proxy {
                 info!("Using SOCKS proxy for .onion address: {}", proxy);
-                match get_info_via_socks(uri, proxy).await {
+                match get_info_via_socks(uri, proxy.clone()).await {
                     Ok(info) => (info.block_height, None, Some(info)),
                     Err(e) => {
                         error!("SOCKS connection failed: {}", e);
@@ -340,28 +314,27 @@ impl Worker {
             match get_info_direct(uri).await {
                 Ok(info) => (info.block_height, None, Some(info)),
                 Err(e) => {
-                    let simplified_error = if e.to_string().contains("tls handshake eof") {
+                    // Render the error chain once and match against that
+                    let error_str = e.to_string();
+                    let simplified_error = if error_str.contains("tls handshake eof") {
                         "TLS handshake failed - server may be offline or not accepting connections"
                             .to_string()
-                    } else if e.to_string().contains("connection refused") {
+                    } else if error_str.contains("connection refused") {
                         "Connection refused - server may be offline or not accepting connections"
                             .to_string()
-                    } else if e.to_string().contains("InvalidContentType") {
+                    } else if error_str.contains("InvalidContentType") {
                         "Invalid content type - server may not be a valid Zcash node".to_string()
-                    } else {
-                        let error_str = e.to_string();
-                        if let Some(start) = error_str.find("message: \"") {
-                            let start = start + 10;
-                            if let Some(end) = error_str[start..].find("\", source:") {
-                                error_str[start..start + end].to_string()
-                            } else if let Some(end) = error_str[start..].find("\"") {
-                                error_str[start..start + end].to_string()
-                            } else {
-                                error_str
-                            }
+                    } else if let Some(start) = error_str.find("message: \"") {
+                        let start = start + 10;
+                        if let Some(end) = error_str[start..].find("\", source:") {
+                            error_str[start..start + end].to_string()
+                        } else if let Some(end) = error_str[start..].find("\"") {
+                            error_str[start..start + end].to_string()
                         } else {
                             error_str
                         }
+                    } else {
+                        error_str
                     };
                     (0, Some(simplified_error), None)
                 }
@@ -404,7 +377,7 @@ impl Worker {
             ),
         }
 
-        let result = CheckResult {
+        Some(CheckResult {
             checker_module: "zec".to_string(),
             hostname: check_request.host.clone(),
             host: check_request.host.clone(),
@@ -444,13 +417,7 @@ impl Worker {
                 .as_ref()
                 .map(|info| info.donation_address.clone()),
             checker_location: self.location.clone(),
-        };
-
-        if let Err(e) = self.submit_to_api(&result).await {
-            error!(%e, "Failed to publish data to API");
-        }
-
-        Ok(())
+        })
     }
 }
 
@@ -472,13 +439,13 @@ pub async fn run_with_location(location: &str) -> Result<(), Box<dyn Error + Sen
         location
     );
     let worker = Worker::new_with_location(location).await?;
+    let jobs_url = format!(
+        "{}/api/v1/jobs?api_key={}&checker_module=zec&limit=10",
+        worker.web_api_url, worker.api_key
+    );
 
     loop {
         info!("📡 Fetching jobs from web API...");
-        let jobs_url = format!(
-            "{}/api/v1/jobs?api_key={}&checker_module=zec&limit=10",
-            worker.web_api_url, worker.api_key
-        );
         match worker.http_client.get(&jobs_url).send().await {
             Ok(response) => {
                 if response.status().is_success() {
@@ -499,19 +466,28 @@ pub async fn run_with_location(location: &str) -> Result<(), Box<dyn Error + Sen
                                     )
                                     .await
                                     {
-                                        Ok(Ok(())) => {}
-                                        Ok(Err(e)) => error!(
-                                            "Error processing check for {}:{}: {}",
-                                            host, port, e
-                                        ),
-                                        Err(_) => error!(
-                                            "Check timed out after {:?} for {}:{}",
-                                            check_timeout, host, port
-                                        ),
+                                        Ok(result) => result,
+                                        Err(_) => {
+                                            error!(
+                                                "Check timed out after {:?} for {}:{}",
+                                                check_timeout, host, port
+                                            );
+                                            None
+                                        }
                                     }
                                 }));
                             }
-                            futures_util::future::join_all(handles).await;
+                            // Submit the whole poll's results in one request
+                            let results: Vec<CheckResult> = futures_util::future::join_all(handles)
+                                .await
+                                .into_iter()
+                                .filter_map(|handle| handle.ok().flatten())
+                                .collect();
+                            if !results.is_empty() {
+                                if let Err(e) = worker.submit_to_api(&results).await {
+                                    error!(%e, "Failed to publish data to API");
+                                }
+                            }
                         }
                         Err(e) => {
                             error!("❌ Failed to parse jobs from web API: {}", e);
@@ -1,7 +1,23 @@
 //! ClickHouse database client for Hosh.
 
 use crate::config::ClickHouseConfig;
-use tracing::{error, info};
+use chrono::Utc;
+use serde::Serialize;
+use tracing::{debug, error, info};
+use uuid::Uuid;
+
+/// A row of the targets table, as sent in a JSONEachRow insert.
+#[derive(Serialize)]
+struct TargetRow<'a> {
+    target_id: Uuid,
+    module: &'a str,
+    hostname: &'a str,
+    port: u16,
+    last_queued_at: &'a str,
+    last_checked_at: &'a str,
+    user_submitted: bool,
+    community: bool,
+}
 
 /// A client for interacting with ClickHouse.
 #[derive(Clone)]
@@ -14,12 +30,19 @@ impl ClickHouseClient {
     /// Create a new ClickHouse client from configuration.
     pub fn new(config: ClickHouseConfig) -> Self {
         let http_client = reqwest::Client::builder()
+            .connect_timeout(std::time::Duration::from_secs(2))
             .pool_idle_timeout(std::time::Duration::from_secs(300))
             .pool_max_idle_per_host(32)
             .tcp_keepalive(std::time::Duration::from_secs(60))
             .build()
             .expect("Failed to create HTTP client");
 
+        Self::with_http_client(config, http_client)
+    }
+
+    /// Create a ClickHouse client that shares an existing HTTP client, and
+    /// with it that client's connection pool.
+    pub fn with_http_client(config: ClickHouseConfig, http_client: reqwest::Client) -> Self {
         Self {
             config,
             http_client,
@@ -41,17 +64,39 @@ impl ClickHouseClient {
         &self,
         query: &str,
     ) -> Result<String, Box<dyn std::error::Error + Send + Sync>> {
-        info!("Executing ClickHouse query");
+        self.execute_query_with_params(query, &[]).await
+    }
+
+    /// Execute a query whose `{name:Type}` placeholders are bound from
+    /// `params`. Values are sent as `param_<name>` URL parameters, so they are
+    /// never spliced into the SQL text.
+    pub async fn execute_query_with_params(
+        &self,
+        query: &str,
+        params: &[(&str, String)],
+    ) -> Result<String, Box<dyn std::error::Error + Send + Sync>> {
+        debug!("Executing ClickHouse query");
 
+        let params: Vec<(String, &str)> = params
+            .iter()
+            .map(|(name, value)| (format!("param_{}", name), value.as_str()))
+            .collect();
         let response = self
             .http_client
             .post(self.config.url())
+            .query(&params)
             .basic_auth(&self.config.user, Some(&self.config.password))
             .header("Content-Type", "text/plain")
             .body(query.to_string())
             .send()
             .await?;
 
+        Self::read_response(response).await
+    }
+
+    async fn read_response(
+        response: reqwest::Response,
+    ) -> Result<String, Box<dyn std::error::Error + Send + Sync>> {
         let status = response.status();
         if !status.is_success() {
             let error_text = response.text().await?;
@@ -74,10 +119,15 @@ impl ClickHouseClient {
         port: u16,
     ) -> Result<bool, Box<dyn std::error::Error + Send + Sync>> {
         let query = format!(
-            "SELECT count() FROM {}.targets WHERE module = '{}' AND hostname = '{}' AND port = {}",
-            self.config.database, module, hostname, port
+            "SELECT count() FROM {}.targets WHERE module = {{module:String}} AND hostname = {{hostname:String}} AND port = {{port:UInt16}}",
+            self.config.database
         );
-        let result = self.execute_query(&query).await?;
+        let params = [
+            ("module", module.to_string()),
+            ("hostname", hostname.to_string()),
+            ("port", port.to_string()),
+        ];
+        let result = self.execute_query_with_params(&query, &params).await?;
         Ok(result.trim().parse::<i64>()? > 0)
     }
 
@@ -94,15 +144,60 @@ impl ClickHouseClient {
             return Ok(());
         }
 
-        let query = format!(
-            "INSERT INTO TABLE {}.targets (target_id, module, hostname, port, last_queued_at, last_checked_at, user_submitted, community) VALUES (generateUUIDv4(), '{}', '{}', {}, now64(3, 'UTC'), now64(3, 'UTC'), false, {})",
-            self.config.database, module, hostname, port, community
-        );
-        self.execute_query(&query).await?;
+        self.insert_targets(module, &[(hostname, port, community)])
+            .await?;
         info!(
             "Successfully inserted target: {} {}:{} (community: {})",
             module, hostname, port, community
         );
         Ok(())
     }
+
+    /// Insert `(hostname, port, community)` targets for a module in a single
+    /// INSERT. The rows are sent as a JSONEachRow body rather than as SQL
+    /// literals, so hostnames from external server lists can't alter the
+    /// statement.
+    pub async fn insert_targets(
+        &self,
+        module: &str,
+        targets: &[(&str, u16, bool)],
+    ) -> Result<(), Box<dyn std::error::Error + Send + Sync>> {
+        if targets.is_empty() {
+            return Ok(());
+        }
+
+        let now = Utc::now().format("%Y-%m-%d %H:%M:%S%.3f").to_string();
+        let mut body = String::new();
+        for &(hostname, port, community) in targets {
+            let row = TargetRow {
+                target_id: Uuid::new_v4(),
+                module,
+                hostname,
+                port,
+                last_queued_at: &now,
+                last_checked_at: &now,
+                user_submitted: false,
+                community,
+            };
+            body.push_str(&serde_json::to_string(&row)?);
+            body.push('\n');
+        }
+
+        let query = format!(
+            "INSERT INTO {}.targets (target_id, module, hostname, port, last_queued_at, last_checked_at, user_submitted, community) FORMAT JSONEachRow",
+            self.config.database
+        );
+        let response = self
+            .http_client
+            .post(self.config.url())
+            .query(&[("query", query)])
+            .basic_auth(&self.config.user, Some(&self.config.password))
+            .header("Content-Type", "application/json")
+            .body(body)
+            .send()
+            .await?;
+
+        Self::read_response(response).await?;
+        Ok(())
+    }
 }
@@ -5,79 +5,77 @@
 //! servers dynamically.
 
 use chrono::{DateTime, Utc};
+use futures::stream::{self, StreamExt};
+use hosh_core::{config::ClickHouseConfig, ClickHouseClient};
 use reqwest::Client;
 use serde::{Deserialize, Serialize};
-use std::{env, error::Error, time::Duration};
+use std::{
+    collections::{HashMap, HashSet},
+    env,
+    error::Error,
+    time::Duration,
+};
 use tokio::time;
-use tracing::{error, info};
+use tracing::{debug, error, info};
 
 // Environment variable constants
 const DEFAULT_DISCOVERY_INTERVAL: u64 = 3600; // 1 hour default
+const BTC_PROBE_CONCURRENCY: usize = 16;
 
-// ClickHouse configuration
-struct ClickHouseConfig {
-    url: String,
-    user: String,
-    password: String,
-    database: String,
-    client: reqwest::Client,
+/// Discovery's target bookkeeping, on top of the shared hosh-core ClickHouse
+/// client.
+struct TargetStore {
+    clickhouse: ClickHouseClient,
 }
 
-impl ClickHouseConfig {
-    fn from_env() -> Self {
-        let host = env::var("CLICKHOUSE_HOST").unwrap_or_else(|_| "chronicler".into());
-        let port = env::var("CLICKHOUSE_PORT").unwrap_or_else(|_| "8123".into());
-        let url = format!("http://{}:{}", host, port);
-        info!("Configuring ClickHouse connection to {}", url);
-
-        Self {
-            url,
-            user: env::var("CLICKHOUSE_USER").unwrap_or_else(|_| "hosh".into()),
-            password: env::var("CLICKHOUSE_PASSWORD")
-                .expect("CLICKHOUSE_PASSWORD environment variable must be set"),
-            database: env::var("CLICKHOUSE_DB").unwrap_or_else(|_| "hosh".into()),
-            client: reqwest::Client::new(),
+/// A module's registered targets, keyed by `(hostname, port)`, with whether
+/// each one was user-submitted.
+type ExistingTargets = HashMap<(String, u16), bool>;
+
+/// Parse `module, hostname, port, user_submitted` rows in TabSeparated format.
+fn parse_existing_targets(rows: &str) -> Result<HashMap<String, ExistingTargets>, Box<dyn Error>> {
+    let mut targets: HashMap<String, ExistingTargets> = HashMap::new();
+    for line in rows.lines() {
+        let mut fields = line.splitn(4, '\t');
+        if let (Some(module), Some(hostname), Some(port), Some(user_submitted)) =
+            (fields.next(), fields.next(), fields.next(), fields.next())
+        {
+            targets.entry(module.to_string()).or_default().insert(
+                (hostname.to_string(), port.parse::<u16>()?),
+                matches!(user_submitted, "true" | "1"),
+            );
         }
     }
+    Ok(targets)
+}
 
-    async fn execute_query(&self, query: &str) -> Result<String, Box<dyn Error>> {
-        info!("Executing ClickHouse query");
-        let response = self
-            .client
-            .post(&self.url)
-            .basic_auth(&self.user, Some(&self.password))
-            .header("Content-Type", "text/plain")
-            .body(query.to_string())
-            .send()
-            .await?;
-
-        let status = response.status();
-        if !status.is_success() {
-            let error_text = response.text().await?;
-            error!(
-                "ClickHouse query failed with status {}: {}",
-                status, error_text
-            );
-            return Err(format!("ClickHouse query failed: {}", error_text).into());
-        }
+/// Whether any target that `cleanup_stale_targets` would delete is registered,
+/// i.e. a non-user-submitted target missing from `listed`.
+fn has_unlisted_targets(existing: &ExistingTargets, listed: &[(&str, u16, bool)]) -> bool {
+    let listed: HashSet<(&str, u16)> = listed.iter().map(|&(host, port, _)| (host, port)).collect();
+    existing.iter().any(|((host, port), &user_submitted)| {
+        !user_submitted && !listed.contains(&(host.as_str(), *port))
+    })
+}
 
-        let result = response.text().await?;
-        info!("ClickHouse query executed successfully");
-        Ok(result)
+impl TargetStore {
+    async fn execute_query(&self, query: &str) -> Result<String, Box<dyn Error>> {
+        self.clickhouse
+            .execute_query(query)
+            .await
+            .map_err(|e| e as Box<dyn Error>)
     }
 
-    async fn target_exists(
-        &self,
-        module: &str,
-        hostname: &str,
-        port: u16,
-    ) -> Result<bool, Box<dyn Error>> {
+    /// Fetch every registered `(hostname, port)`, grouped by module, in one
+    /// query, so a discovery cycle doesn't need a round trip per server or
+    /// per module.
+    async fn existing_targets(&self) -> Result<HashMap<String, ExistingTargets>, Box<dyn Error>> {
         let query = format!(
-            "SELECT count() FROM {}.targets WHERE module = '{}' AND hostname = '{}' AND port = {}",
-            self.database, module, hostname, port
+            "SELECT module, hostname, port, user_submitted FROM {}.targets FORMAT TabSeparated",
+            self.clickhouse.database()
         );
         let result = self.execute_query(&query).await?;
-        Ok(result.trim().parse::<i64>()? > 0)
+        parse_existing_targets(&result)
     }
 
     /// Remove ZEC targets that are no longer present in the static `ZEC_SERVERS` list.
@@ -100,34 +98,29 @@ impl ClickHouseConfig {
         // but never touch user-submitted servers.
         let query = format!(
             "DELETE FROM {}.targets WHERE module = 'zec' AND user_submitted = false AND (hostname, port) NOT IN ({})",
-            self.database, keep
+            self.clickhouse.database(), keep
         );
         self.execute_query(&query).await?;
         info!("Cleaned up stale ZEC targets not in the static list");
         Ok(())
     }
 
-    async fn insert_target(
+    /// Insert new `(hostname, port, community)` targets for a module in a
+    /// single INSERT.
+    async fn insert_targets(
         &self,
         module: &str,
-        hostname: &str,
-        port: u16,
-        community: bool,
+        targets: &[(&str, u16, bool)],
     ) -> Result<(), Box<dyn Error>> {
-        if self.target_exists(module, hostname, port).await? {
-            info!("Target already exists: {} {}:{}", module, hostname, port);
+        if targets.is_empty() {
             return Ok(());
         }
 
-        let query = format!(
-            "INSERT INTO TABLE {}.targets (target_id, module, hostname, port, last_queued_at, last_checked_at, user_submitted, community) VALUES (generateUUIDv4(), '{}', '{}', {}, now64(3, 'UTC'), now64(3, 'UTC'), false, {})",
-            self.database, module, hostname, port, community
-        );
-        self.execute_query(&query).await?;
-        info!(
-            "Successfully inserted target: {} {}:{} (community: {})",
-            module, hostname, port, community
-        );
+        self.clickhouse
+            .insert_targets(module, targets)
+            .await
+            .map_err(|e| e as Box<dyn Error>)?;
+        info!("Successfully inserted {} {} targets", targets.len(), module);
         Ok(())
     }
 }
@@ -366,9 +359,9 @@ struct ServerData {
 }
 
 async fn fetch_btc_servers(
+    client: &Client,
 ) -> Result<std::collections::HashMap<String, BtcServerDetails>, Box<dyn Error>> {
     info!("Fetching BTC servers from Electrum repository...");
-    let client = reqwest::Client::new();
     let response = client
         .get("https://raw.githubusercontent.com/spesmilo/electrum/refs/heads/master/electrum/chains/mainnet/servers.json")
         .timeout(Duration::from_secs(10))
@@ -415,67 +408,87 @@ async fn get_server_details(
 
 async fn update_servers(
     client: &reqwest::Client,
-    clickhouse: &ClickHouseConfig,
+    clickhouse: &TargetStore,
 ) -> Result<(), Box<dyn std::error::Error>> {
+    // Load the registered targets for every module up front, in one query
+    let mut existing = clickhouse.existing_targets().await?;
+
     // Process ZEC servers first
     info!("Processing {} ZEC servers...", ZEC_SERVERS.len());
-    for (host, port, community) in ZEC_SERVERS {
-        info!(
+    let existing_zec = existing.remove("zec").unwrap_or_default();
+    let mut new_zec = Vec::new();
+    for &(host, port, community) in ZEC_SERVERS {
+        debug!(
             "Processing ZEC server: {}:{} (community: {})",
             host, port, community
         );
-        if !clickhouse.target_exists("zec", host, *port).await? {
-            if let Err(e) = clickhouse
-                .insert_target("zec", host, *port, *community)
-                .await
-            {
-                error!("Failed to insert ZEC server {}:{}: {}", host, port, e);
-            }
+        if !existing_zec.contains_key(&(host.to_string(), port)) {
+            new_zec.push((host, port, community));
         } else {
-            info!("ZEC server {}:{} already exists, skipping", host, port);
+            debug!("ZEC server {}:{} already exists, skipping", host, port);
         }
     }
+    info!(
+        "{} of {} ZEC servers are new",
+        new_zec.len(),
+        ZEC_SERVERS.len()
+    );
+    if let Err(e) = clickhouse.insert_targets("zec", &new_zec).await {
+        error!("Failed to insert {} ZEC servers: {}", new_zec.len(), e);
+    }
 
-    // Remove any ZEC targets that have been dropped from the static list.
-    if let Err(e) = clickhouse.cleanup_stale_targets(ZEC_SERVERS).await {
-        error!("Failed to clean up stale ZEC targets: {}", e);
+    // Remove any ZEC targets that have been dropped from the static list. Every
+    // DELETE queues a mutation over the table, so only issue one when a target
+    // the DELETE would remove is actually registered
+    if has_unlisted_targets(&existing_zec, ZEC_SERVERS) {
+        if let Err(e) = clickhouse.cleanup_stale_targets(ZEC_SERVERS).await {
+            error!("Failed to clean up stale ZEC targets: {}", e);
+        }
     }
 
     // Process BTC servers
-    let btc_servers = fetch_btc_servers().await?;
+    let btc_servers = fetch_btc_servers(client).await?;
     info!("Processing {} BTC servers...", btc_servers.len());
-    for (host, details) in btc_servers {
+    let existing_btc = existing.remove("btc").unwrap_or_default();
+    let mut new_btc = Vec::new();
+    for (host, details) in &btc_servers {
         let port = details
             .s
+            .as_deref()
             .and_then(|s| s.parse::<u16>().ok())
             .unwrap_or(50001);
-        info!("Processing BTC server: {}:{}", host, port);
-
-        if !clickhouse.target_exists("btc", &host, port).await? {
-            // Try to get details but don't require success
-            let details = get_server_details(client, &host, port).await;
-            match details {
-                Ok(_) => {
-                    if let Err(e) = clickhouse.insert_target("btc", &host, port, false).await {
-                        error!("Failed to insert BTC server {}:{}: {}", host, port, e);
-                    }
-                }
-                Err(e) => {
-                    // Still insert the target even if verification fails
-                    info!(
-                        "Could not verify BTC server {}:{}: {}, but inserting anyway",
-                        host, port, e
-                    );
-                    if let Err(e) = clickhouse.insert_target("btc", &host, port, false).await {
-                        error!("Failed to insert BTC server {}:{}: {}", host, port, e);
-                    }
-                }
-            }
+        debug!("Processing BTC server: {}:{}", host, port);
+
+        if !existing_btc.contains_key(&(host.clone(), port)) {
+            new_btc.push((host.as_str(), port, false));
         } else {
-            info!("BTC server {}:{} already exists, skipping", host, port);
+            debug!("BTC server {}:{} already exists, skipping", host, port);
         }
     }
 
+    info!(
+        "{} of {} BTC servers are new",
+        new_btc.len(),
+        btc_servers.len()
+    );
+
+    // Try to get details for the new servers, a bounded number at a time
+    // rather than one after another. Success isn't required; the targets are
+    // inserted even if verification fails
+    stream::iter(&new_btc)
+        .for_each_concurrent(BTC_PROBE_CONCURRENCY, |&(host, port, _)| async move {
+            if let Err(e) = get_server_details(client, host, port).await {
+                debug!(
+                    "Could not verify BTC server {}:{}: {}, but inserting anyway",
+                    host, port, e
+                );
+            }
+        })
+        .await;
+    if let Err(e) = clickhouse.insert_targets("btc", &new_btc).await {
+        error!("Failed to insert {} BTC servers: {}", new_btc.len(), e);
+    }
+
     Ok(())
 }
 
@@ -486,9 +499,18 @@ async fn update_servers(
 pub async fn run() -> Result<(), Box<dyn Error + Send + Sync>> {
     info!("Starting discovery service...");
 
-    // Initialize ClickHouse client
-    let clickhouse = ClickHouseConfig::from_env();
-    let http_client = Client::new();
+    // One pooled HTTP client serves both the ClickHouse queries and the BTC
+    // server list fetches, reusing keep-alive connections across a cycle
+    let http_client = Client::builder()
+        .pool_idle_timeout(Duration::from_secs(300))
+        .pool_max_idle_per_host(32)
+        .tcp_keepalive(Duration::from_secs(60))
+        .build()?;
+    let config = ClickHouseConfig::from_env();
+    info!("Configuring ClickHouse connection to {}", config.url());
+    let clickhouse = TargetStore {
+        clickhouse: ClickHouseClient::with_http_client(config, http_client.clone()),
+    };
     info!("Initialized ClickHouse client");
 
     // Get discovery interval from environment or use default
@@ -514,3 +536,34 @@ pub async fn run() -> Result<(), Box<dyn Error + Send + Sync>> {
         time::sleep(Duration::from_secs(discovery_interval)).await;
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_parse_existing_targets() {
+        let rows = "zec\tzec.rocks\t443\tfalse\nzec\tmy.node\t9067\ttrue\nbtc\telectrum.example\t50002\tfalse\n";
+        let targets = parse_existing_targets(rows).unwrap();
+        assert_eq!(targets["zec"].len(), 2);
+        assert!(!targets["zec"][&("zec.rocks".to_string(), 443)]);
+        assert!(targets["zec"][&("my.node".to_string(), 9067)]);
+        assert_eq!(targets["btc"].len(), 1);
+        assert!(parse_existing_targets("zec\tzec.rocks\tnot-a-port\tfalse").is_err());
+    }
+
+    #[test]
+    fn test_has_unlisted_targets() {
+        let listed = [("zec.rocks", 443, false)];
+        let mut existing = ExistingTargets::new();
+        existing.insert(("zec.rocks".to_string(), 443), false);
+        assert!(!has_unlisted_targets(&existing, &listed));
+
+        // User-submitted targets are never deleted, so they don't count
+        existing.insert(("my.node".to_string(), 9067), true);
+        assert!(!has_unlisted_targets(&existing, &listed));
+
+        existing.insert(("old.node".to_string(), 443), false);
+        assert!(has_unlisted_targets(&existing, &listed));
+    }
+}
@@ -6,10 +6,11 @@
 use actix_files as fs;
 use actix_web::{
     get,
+    http::header,
     middleware::Logger,
     post,
     web::{self, Redirect},
-    App, HttpResponse, HttpServer, Result,
+    App, HttpRequest, HttpResponse, HttpServer, Result,
 };
 use askama::Template;
 use chrono::{DateTime, FixedOffset, Utc};
@@ -17,12 +18,13 @@ use qrcode::{render::svg, QrCode};
 use serde::de::Error;
 use serde::{Deserialize, Serialize};
 use serde_json::Value;
+use std::borrow::Cow;
 use std::collections::HashMap;
 use std::env;
 use std::sync::Arc;
 use tokio::sync::RwLock;
-use tokio::time::{interval, Duration};
-use tracing::{error, info, warn};
+use tokio::time::{interval, Duration, MissedTickBehavior};
+use tracing::{debug, error, info, warn};
 
 // =============================================================================
 // MINIMUM SUPPORTED NODE VERSIONS
@@ -58,8 +60,8 @@ mod filters {
 
 #[derive(Template)]
 #[template(path = "index.html")]
-struct IndexTemplate {
-    servers: Vec<ServerInfo>,
+struct IndexTemplate<'a> {
+    servers: Vec<&'a ServerInfo>,
     percentile_height: u64,
     current_network: &'static str,
     total_count: usize,
@@ -118,6 +120,32 @@ struct ServerInfo {
 
     #[serde(default)]
     uptime_30_day: Option<f64>,
+
+    /// Set on rows synthesized because a result couldn't be parsed. They are
+    /// listed on the page but left out of the JSON API.
+    #[serde(skip)]
+    placeholder: bool,
+}
+
+/// One row of the network status or API query. Deserializing straight into the
+/// known columns skips building a `Value` map (and its key strings) for every
+/// row.
+#[derive(Debug, Deserialize)]
+struct StatusRow {
+    #[serde(default)]
+    hostname: Option<String>,
+    #[serde(default)]
+    checked_at: Option<String>,
+    #[serde(default)]
+    ping: Option<f64>,
+    #[serde(default)]
+    response_data: Option<String>,
+    #[serde(default)]
+    uptime_30_day: Option<f64>,
+    #[serde(default)]
+    community: Option<bool>,
+    #[serde(default)]
+    first_seen: Option<String>,
 }
 
 fn deserialize_port<'de, D>(deserializer: D) -> Result<Option<u16>, D::Error>
@@ -347,6 +375,13 @@ fn clean_error_message(input: &str) -> String {
     cleaned
 }
 
+/// Check that `input` is well-formed JSON. Deserializing into `IgnoredAny`
+/// runs the full syntax check without building a `Value` tree that the
+/// repair strategies would only throw away.
+fn is_valid_json(input: &str) -> bool {
+    serde_json::from_str::<serde::de::IgnoredAny>(input).is_ok()
+}
+
 /// Validate and attempt to fix malformed JSON strings
 fn validate_and_fix_json(input: &str) -> Option<String> {
     if input.trim().is_empty() {
@@ -354,7 +389,7 @@ fn validate_and_fix_json(input: &str) -> Option<String> {
     }
 
     // First, try to parse as-is
-    if serde_json::from_str::<serde_json::Value>(input).is_ok() {
+    if is_valid_json(input) {
         return Some(input.to_string());
     }
 
@@ -391,7 +426,7 @@ fn validate_and_fix_json(input: &str) -> Option<String> {
     }
 
     // Try parsing the fixed version
-    if serde_json::from_str::<serde_json::Value>(&result).is_ok() {
+    if is_valid_json(&result) {
         return Some(result);
     }
 
@@ -410,7 +445,7 @@ fn validate_and_fix_json(input: &str) -> Option<String> {
         .replace("][", "],[") // Fix missing comma between arrays
         .replace("}[", "},["); // Fix missing comma between object and array
 
-    if serde_json::from_str::<serde_json::Value>(&aggressive_fix).is_ok() {
+    if is_valid_json(&aggressive_fix) {
         return Some(aggressive_fix);
     }
 
@@ -434,7 +469,7 @@ fn extract_valid_json_substring(input: &str) -> Option<String> {
     if let Some(start) = input.find('{') {
         if let Some(end) = find_matching_brace(&input[start..]) {
             let candidate = &input[start..start + end + 1];
-            if serde_json::from_str::<serde_json::Value>(candidate).is_ok() {
+            if is_valid_json(candidate) {
                 return Some(candidate.to_string());
             }
         }
@@ -444,7 +479,7 @@ fn extract_valid_json_substring(input: &str) -> Option<String> {
     if let Some(start) = input.find('[') {
         if let Some(end) = find_matching_bracket(&input[start..]) {
             let candidate = &input[start..start + end + 1];
-            if serde_json::from_str::<serde_json::Value>(candidate).is_ok() {
+            if is_valid_json(candidate) {
                 return Some(candidate.to_string());
             }
         }
@@ -519,15 +554,18 @@ fn find_matching_bracket(input: &str) -> Option<usize> {
     None
 }
 
+/// Matches `"key":"value"` or `"key":value` pairs in malformed JSON.
+/// Compiled once rather than on every fallback parse.
+static JSON_PAIR_REGEX: std::sync::LazyLock<regex::Regex> = std::sync::LazyLock::new(|| {
+    regex::Regex::new(r#""([^"]+)"\s*:\s*("([^"]*)"|([^,}\]]+))"#).unwrap()
+});
+
 /// Create a minimal valid JSON object from malformed input
 fn create_minimal_json(input: &str) -> Option<String> {
     // Try to extract key-value pairs from the malformed JSON
     let mut pairs = Vec::new();
 
-    // Look for patterns like "key":"value" or "key":value
-    let re = regex::Regex::new(r#""([^"]+)"\s*:\s*("([^"]*)"|([^,}\]]+))"#).ok()?;
-
-    for cap in re.captures_iter(input) {
+    for cap in JSON_PAIR_REGEX.captures_iter(input) {
         let key = cap.get(1)?.as_str();
         let value = if let Some(quoted_value) = cap.get(2) {
             quoted_value.as_str()
@@ -764,70 +802,16 @@ impl ServerInfo {
         }
     }
 
+    fn last_updated_raw(&self) -> &str {
+        self.last_updated.as_deref().unwrap_or("")
+    }
+
     fn formatted_last_updated(&self) -> String {
         if let Some(last_updated) = &self.last_updated {
-            // Try to parse the timestamp with multiple strategies
-            let mut parsed_time = None;
-
-            // Remove surrounding quotes if present
-            let clean_timestamp = last_updated.trim_matches('\'');
-
-            // Strategy 0: Use custom parsing function for RFC3339 with nanoseconds
             if let Some(time) = parse_rfc3339_with_nanos(last_updated) {
-                parsed_time = Some(time);
-            }
-            // Strategy 1: Direct RFC3339 parsing
-            else if let Ok(time) = DateTime::parse_from_rfc3339(clean_timestamp) {
-                parsed_time = Some(time);
-            }
-            // Strategy 2: Try with Z suffix if missing
-            else if let Ok(time) = DateTime::parse_from_rfc3339(&format!("{}Z", clean_timestamp))
-            {
-                parsed_time = Some(time);
-            }
-            // Strategy 3: Try parsing as naive datetime first (handles nanoseconds better)
-            else if let Some(naive_str) = clean_timestamp.strip_suffix('Z') {
-                // Remove the Z suffix and parse as naive datetime
-                let formats = [
-                    "%Y-%m-%dT%H:%M:%S%.f",
-                    "%Y-%m-%dT%H:%M:%S%.9f", // Support for 9-digit nanoseconds
-                    "%Y-%m-%dT%H:%M:%S",
-                ];
-
-                for format in &formats {
-                    if let Ok(dt) = chrono::NaiveDateTime::parse_from_str(naive_str, format) {
-                        parsed_time = Some(
-                            DateTime::<Utc>::from_naive_utc_and_offset(dt, Utc)
-                                .with_timezone(&FixedOffset::east_opt(0).unwrap()),
-                        );
-                        break;
-                    }
-                }
-            }
-            // Strategy 4: Try naive datetime parsing with nanoseconds
-            else {
-                let formats = [
-                    "%Y-%m-%dT%H:%M:%S%.f",
-                    "%Y-%m-%dT%H:%M:%S%.9f", // Support for 9-digit nanoseconds
-                    "%Y-%m-%dT%H:%M:%S",
-                    "%Y-%m-%d %H:%M:%S%.f",
-                    "%Y-%m-%d %H:%M:%S",
-                ];
-
-                for format in &formats {
-                    if let Ok(dt) = chrono::NaiveDateTime::parse_from_str(clean_timestamp, format) {
-                        parsed_time = Some(
-                            DateTime::<Utc>::from_naive_utc_and_offset(dt, Utc)
-                                .with_timezone(&FixedOffset::east_opt(0).unwrap()),
-                        );
-                        break;
-                    }
-                }
-            }
-
-            if let Some(time) = parsed_time {
-                let now = Utc::now().with_timezone(time.offset());
-                let duration = now.signed_duration_since(time);
+                // signed_duration_since compares instants across offsets, so
+                // there's no need to convert "now" into each row's timezone
+                let duration = Utc::now().signed_duration_since(time);
 
                 let total_seconds = duration.num_seconds();
                 if total_seconds < 0 {
@@ -1006,16 +990,46 @@ fn version_meets_minimum(version: &str, minimum: &str) -> bool {
     true // Equal versions
 }
 
+/// Settings that differ between the supported networks.
+#[derive(Debug)]
+struct NetworkSpec {
+    name: &'static str,
+    /// Port reported by the API when a server row has none
+    default_port: u16,
+    /// Protocol reported by the API for this network's servers
+    api_protocol: &'static str,
+}
+
+/// Supported networks, in cache refresh order.
+const NETWORKS: [NetworkSpec; 2] = [
+    NetworkSpec {
+        name: "zec",
+        default_port: 443,
+        api_protocol: "grpc",
+    },
+    NetworkSpec {
+        name: "btc",
+        default_port: 50002,
+        api_protocol: "ssl",
+    },
+];
+
 #[derive(Debug)]
 struct SafeNetwork(&'static str);
 
 impl SafeNetwork {
     fn from_str(s: &str) -> Option<Self> {
-        match s {
-            "btc" => Some(SafeNetwork("btc")),
-            "zec" => Some(SafeNetwork("zec")),
-            _ => None,
-        }
+        NETWORKS
+            .iter()
+            .find(|spec| spec.name == s)
+            .map(|spec| SafeNetwork(spec.name))
+    }
+
+    fn spec(&self) -> &'static NetworkSpec {
+        NETWORKS
+            .iter()
+            .find(|spec| spec.name == self.0)
+            .expect("SafeNetwork is only built from NETWORKS")
     }
 }
 
@@ -1090,12 +1104,36 @@ fn validate_timestamp_bounds(at: DateTime<Utc>) -> Result<(), String> {
 
 /// Generate the SQL time reference expression.
 /// For historical queries, returns a parseDateTimeBestEffort expression.
-/// For current queries, returns "now()".
-fn time_reference_sql(at: Option<DateTime<Utc>>) -> String {
+/// For current queries, returns "now()", borrowed so the refresh cycle's
+/// queries don't allocate it each time.
+fn time_reference_sql(at: Option<DateTime<Utc>>) -> Cow<'static, str> {
     match at {
-        Some(dt) => format!("parseDateTimeBestEffort('{}')", dt.to_rfc3339()),
-        None => "now()".to_string(),
+        Some(dt) => Cow::Owned(format!("parseDateTimeBestEffort('{}')", dt.to_rfc3339())),
+        None => Cow::Borrowed("now()"),
+    }
+}
+
+/// ClickHouse settings sent with the web service's queries. The HTTP client
+/// gives up after 10s; this stops ClickHouse at the same point rather than
+/// letting it finish a query nobody is waiting for.
+const ON_DEMAND_QUERY_SETTINGS: [(&str, &str); 1] = [("max_execution_time", "10")];
+
+/// Memory limits for the network status query, which scans every result in
+/// the window; large sorts spill to disk instead of failing.
+const NETWORK_QUERY_MEMORY_SETTINGS: [(&str, &str); 2] = [
+    ("max_memory_usage", "4000000000"),
+    ("max_bytes_before_external_sort", "2000000000"),
+];
+
+/// ClickHouse HTTP query parameters binding `{host:String}` and, when a port
+/// is given, `{port:UInt16}`. Values are sent as `param_*` URL parameters so
+/// ClickHouse parses them as typed literals instead of SQL.
+fn host_query_params(host: &str, port: Option<u16>) -> Vec<(&'static str, String)> {
+    let mut params = vec![("param_host", host.to_string())];
+    if let Some(port) = port {
+        params.push(("param_port", port.to_string()));
     }
+    params
 }
 
 /// Format a historical timestamp for display in templates.
@@ -1167,8 +1205,8 @@ struct ApiServerInfo {
 }
 
 #[derive(Serialize)]
-struct ApiResponse {
-    servers: Vec<ApiServerInfo>,
+struct ApiResponse<'a> {
+    servers: Vec<&'a ApiServerInfo>,
 }
 
 #[derive(Deserialize)]
@@ -1244,12 +1282,92 @@ impl Config {
 
 #[derive(Clone)]
 struct CacheEntry {
-    html: String,
+    /// Rendered body. Bytes is reference counted, so responses share the
+    /// cached buffer instead of copying the page on every hit.
+    html: web::Bytes,
+    etag: String,
     timestamp: std::time::Instant,
 }
 
+impl CacheEntry {
+    fn new(html: String) -> Self {
+        use std::hash::{Hash, Hasher};
+
+        let mut hasher = std::collections::hash_map::DefaultHasher::new();
+        html.hash(&mut hasher);
+
+        Self {
+            etag: format!("\"{:016x}\"", hasher.finish()),
+            html: web::Bytes::from(html),
+            timestamp: std::time::Instant::now(),
+        }
+    }
+}
+
+/// Whether an `If-None-Match` header value matches the given ETag.
+fn if_none_match_contains(header: &str, etag: &str) -> bool {
+    header
+        .split(',')
+        .map(|tag| tag.trim())
+        .any(|tag| tag == "*" || tag == etag || tag.strip_prefix("W/") == Some(etag))
+}
+
+/// Whether the client already has this cache entry, so a 304 can be sent
+/// instead of the body.
+fn is_not_modified(req: &HttpRequest, entry: &CacheEntry) -> bool {
+    req.headers()
+        .get(header::IF_NONE_MATCH)
+        .and_then(|v| v.to_str().ok())
+        .map(|v| if_none_match_contains(v, &entry.etag))
+        .unwrap_or(false)
+}
+
 type PageCache = Arc<RwLock<HashMap<String, CacheEntry>>>;
 
+/// How long a page rendered on request (server details, historical and
+/// operator views) is reused before re-querying. Matches the refresh interval
+/// of the pre-warmed network pages.
+const ON_DEMAND_CACHE_TTL: std::time::Duration = std::time::Duration::from_secs(20);
+
+/// Prefix shared by all server detail entries in the page cache, so they can
+/// be pruned without touching the pre-warmed network pages.
+const SERVER_DETAIL_CACHE_PREFIX: &str = "detail-";
+
+/// Cache key for a server detail page. Pages requested without an explicit
+/// port are cached separately from ones that name it.
+fn server_detail_cache_key(network: &str, host: &str, port: Option<u16>) -> String {
+    match port {
+        Some(port) => format!(
+            "{}{}-{}:{}",
+            SERVER_DETAIL_CACHE_PREFIX, network, host, port
+        ),
+        None => format!("{}{}-{}", SERVER_DETAIL_CACHE_PREFIX, network, host),
+    }
+}
+
+/// Prefix shared by historical and operator network pages in the page cache.
+const DIRECT_VIEW_CACHE_PREFIX: &str = "direct-";
+
+/// Cache key for a network page rendered on request. A historical `at`
+/// timestamp pins the underlying data, so it doubles as the dataset
+/// fingerprint: repeat views of a shared link reuse the rendered page.
+fn direct_view_cache_key(
+    network: &str,
+    hide_community: bool,
+    tor_only: bool,
+    show_outdated: bool,
+    operator: Option<&str>,
+    at: Option<DateTime<Utc>>,
+) -> String {
+    format!(
+        "{}{}-{}-{}",
+        DIRECT_VIEW_CACHE_PREFIX,
+        page_cache_key(network, hide_community, tor_only, show_outdated),
+        operator.unwrap_or(""),
+        at.map(|at| at.timestamp_millis()).unwrap_or_default()
+    )
+}
+
 #[derive(Clone)]
 struct Worker {
     clickhouse: ClickhouseConfig,
@@ -1274,6 +1392,45 @@ async fn fetch_and_render_network_status(
     operator: Option<&str>,
     at: Option<DateTime<Utc>>,
 ) -> Result<String> {
+    let servers = fetch_network_servers(worker, network, at).await?;
+    let summary = NetworkSummary::new(&servers, network);
+    render_network_status(
+        &servers,
+        &summary,
+        network,
+        hide_community,
+        tor_only,
+        show_outdated,
+        operator,
+        at,
+    )
+}
+
+/// Fields read directly when salvaging a server from a malformed row; any
+/// other field is kept in `extra`.
+const FALLBACK_SERVER_FIELDS: &[&str] = &[
+    "host",
+    "port",
+    "height",
+    "status",
+    "error",
+    "error_type",
+    "error_message",
+    "last_updated",
+    "ping",
+    "server_version",
+    "user_submitted",
+    "check_id",
+];
+
+/// Fetch the latest result for every server on a network, sorted for display.
+/// The index page filters only affect rendering, so one fetch can back every
+/// filter combination.
+async fn fetch_network_servers(
+    worker: &Worker,
+    network: &SafeNetwork,
+    at: Option<DateTime<Utc>>,
+) -> Result<Vec<ServerInfo>> {
     // Generate time reference for SQL queries
     let time_ref = time_reference_sql(at);
     let upper_bound = if at.is_some() {
@@ -1294,25 +1451,40 @@ async fn fetch_and_render_network_status(
     // where percentage_of_month_announced = min(days_since_first_seen, 30) / 30
     let query = format!(
         r#"
+        -- PREWHERE filters on the small module/timestamp columns before the
+        -- large response_data column is read for the surviving rows
         WITH latest_results AS (
             SELECT
-                r.*,
+                r.hostname,
+                r.port,
+                r.checker_module,
+                r.checked_at,
+                r.ping_ms,
+                r.response_data,
                 ROW_NUMBER() OVER (PARTITION BY r.hostname, r.port ORDER BY r.checked_at DESC) as rn
             FROM {db}.results r
-            WHERE r.checker_module = '{network}'
+            PREWHERE r.checker_module = '{network}'
             AND r.checked_at >= {time_ref} - INTERVAL {window} DAY
             {upper_bound}
+            -- Only rank rows for registered targets; the targets join below
+            -- would drop the rest anyway
+            WHERE (r.hostname, r.port) IN (
+                SELECT hostname, port FROM {db}.targets WHERE module = '{network}'
+            )
         ),
         -- Calculate first_seen and percentage of month for each server
+        -- Read from the hourly uptime_stats_by_port rollup instead of taking
+        -- min() over the network's entire results history. Truncating to the
+        -- hour doesn't change the hour-based dateDiff, and the rollup has the
+        -- same (hostname, port) keys the uptime join below uses.
         first_seen_per_server AS (
             SELECT
                 hostname,
-                toString(port) as port,
-                min(checked_at) as first_seen,
-                least(dateDiff('hour', min(checked_at), {time_ref}), 720) / 720.0 as percentage_of_month
-            FROM {db}.results
-            WHERE checker_module = '{network}'
-            AND checked_at <= {time_ref}
+                port,
+                min(time_bucket) as first_seen,
+                least(dateDiff('hour', min(time_bucket), {time_ref}), 720) / 720.0 as percentage_of_month
+            FROM {db}.uptime_stats_by_port
+            WHERE time_bucket <= {time_ref}
             GROUP BY hostname, port
         ),
         uptime_30_day AS (
@@ -1330,7 +1502,6 @@ async fn fetch_and_render_network_status(
         SELECT
             lr.hostname,
             lr.checked_at,
-            lr.status,
             lr.ping_ms as ping,
             lr.response_data,
             u30.uptime_percentage as uptime_30_day,
@@ -1351,20 +1522,17 @@ async fn fetch_and_render_network_status(
         uptime_upper_bound = uptime_upper_bound,
     );
 
-    info!(
+    debug!(
         "Executing ClickHouse query for network {} with window of {} days",
         network.0, worker.config.results_window_days
     );
 
-    // Add query settings via URL parameters to limit memory usage
-    let url_with_params = format!(
-        "{}?max_memory_usage=4000000000&max_bytes_before_external_sort=2000000000",
-        worker.clickhouse.url
-    );
-
+    // Limit memory usage and runtime via query settings
     let response = worker
         .http_client
-        .post(&url_with_params)
+        .post(&worker.clickhouse.url)
+        .query(&ON_DEMAND_QUERY_SETTINGS)
+        .query(&NETWORK_QUERY_MEMORY_SETTINGS)
         .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
         .header("Content-Type", "text/plain")
         .body(query.clone())
@@ -1391,26 +1559,7 @@ async fn fetch_and_render_network_status(
     // Handle empty response case
     if body.trim().is_empty() {
         info!("No results found for network {}", network.0);
-        let template = IndexTemplate {
-            servers: Vec::new(),
-            percentile_height: 0,
-            current_network: network.0,
-            total_count: 0,
-            community_count: 0,
-            hide_community,
-            tor_only,
-            show_outdated,
-            outdated_count: 0,
-            onion_count: 0,
-            historical_at: format_historical_timestamp(at),
-        };
-
-        let html = template.render().map_err(|e| {
-            error!("Template rendering error: {}", e);
-            actix_web::error::ErrorInternalServerError("Template rendering failed")
-        })?;
-
-        return Ok(html);
+        return Ok(Vec::new());
     }
 
     // Parse results line by line (JSONEachRow format)
@@ -1420,18 +1569,14 @@ async fn fetch_and_render_network_status(
             continue;
         }
 
-        // First, try to parse the line as JSON
-        match serde_json::from_str::<serde_json::Value>(line) {
+        // First, try to parse the line into its known columns
+        match serde_json::from_str::<StatusRow>(line) {
             Ok(result) => {
+                let hostname = result.hostname.as_deref().unwrap_or("unknown");
+
                 // Get response_data, with better error handling
-                let response_data = match result.get("response_data") {
-                    Some(val) => match val {
-                        Value::String(s) => s,
-                        _ => {
-                            error!("response_data is not a string: {:?}", val);
-                            "{}"
-                        }
-                    },
+                let response_data = match result.response_data.as_deref() {
+                    Some(s) => s,
                     None => {
                         error!("No response_data field in response: {:?}", result);
                         "{}"
@@ -1440,53 +1585,55 @@ async fn fetch_and_render_network_status(
 
                 // Validate that response_data looks like valid JSON
                 if response_data.trim().is_empty() || response_data == "{}" {
-                    warn!(
-                        "Empty or invalid response_data for host: {}",
-                        result["hostname"].as_str().unwrap_or("unknown")
-                    );
+                    warn!("Empty or invalid response_data for host: {}", hostname);
                     continue;
                 }
 
-                // Try to validate and fix the JSON if needed
-                let cleaned_response_data =
-                    validate_and_fix_json(response_data).unwrap_or_else(|| {
-                        let hostname = result["hostname"].as_str().unwrap_or("unknown");
-                        warn!("Could not fix malformed JSON for host: {}", hostname);
-
-                        // Log the problematic JSON for debugging
-                        log_problematic_json(hostname, response_data);
-
-                        // Try to get more detailed error information
-                        if let Err(detailed_error) = validate_json_with_details(response_data) {
-                            warn!(
-                                "JSON validation details for host {}: {}",
-                                hostname, detailed_error
-                            );
-                        }
+                // Well-formed rows, the common case, deserialize straight into
+                // ServerInfo. Only rows that fail go through the JSON repair
+                // pass, which re-parses the payload for each strategy it tries.
+                let (parsed, cleaned_response_data) =
+                    match serde_json::from_str::<ServerInfo>(response_data) {
+                        Ok(server_info) => (Ok(server_info), Cow::Borrowed(response_data)),
+                        Err(_) => {
+                            let cleaned =
+                                validate_and_fix_json(response_data).unwrap_or_else(|| {
+                                    warn!("Could not fix malformed JSON for host: {}", hostname);
+
+                                    // Log the problematic JSON for debugging
+                                    log_problematic_json(hostname, response_data);
+
+                                    // Try to get more detailed error information
+                                    if let Err(detailed_error) =
+                                        validate_json_with_details(response_data)
+                                    {
+                                        warn!(
+                                            "JSON validation details for host {}: {}",
+                                            hostname, detailed_error
+                                        );
+                                    }
 
-                        "{}".to_string()
-                    });
+                                    "{}".to_string()
+                                });
+                            (
+                                serde_json::from_str::<ServerInfo>(&cleaned),
+                                Cow::Owned(cleaned),
+                            )
+                        }
+                    };
 
-                // Try to parse the response_data as ServerInfo
-                match serde_json::from_str::<ServerInfo>(&cleaned_response_data) {
+                match parsed {
                     Ok(mut server_info) => {
                         // Add the uptime_30_day from the query result
-                        server_info.uptime_30_day =
-                            result.get("uptime_30_day").and_then(|v| v.as_f64());
+                        server_info.uptime_30_day = result.uptime_30_day;
                         // Add the community flag from the query result
-                        server_info.community = result
-                            .get("community")
-                            .and_then(|v| v.as_bool())
-                            .unwrap_or(false);
+                        server_info.community = result.community.unwrap_or(false);
 
                         // Store the first_seen field in the extra HashMap for later use
-                        if let Some(first_seen_str) =
-                            result.get("first_seen").and_then(|v| v.as_str())
-                        {
-                            server_info.extra.insert(
-                                "first_seen".to_string(),
-                                serde_json::Value::String(first_seen_str.to_string()),
-                            );
+                        if let Some(first_seen) = result.first_seen {
+                            server_info
+                                .extra
+                                .insert("first_seen".to_string(), Value::String(first_seen));
                         }
 
                         servers.push(server_info);
@@ -1495,9 +1642,7 @@ async fn fetch_and_render_network_status(
                         // If parsing fails, try to create a minimal ServerInfo with available data
                         warn!(
                             "Failed to parse server info for host {}: {} (raw data: {})",
-                            result["hostname"].as_str().unwrap_or("unknown"),
-                            e,
-                            response_data
+                            hostname, e, response_data
                         );
 
                         // Log specific field type issues
@@ -1520,7 +1665,7 @@ async fn fetch_and_render_network_status(
                         }
 
                         // Create a fallback ServerInfo with basic information
-                        if let Some(hostname) = result["hostname"].as_str() {
+                        if let Some(hostname) = result.hostname.as_deref() {
                             let mut fallback_server = ServerInfo {
                                 host: hostname.to_string(),
                                 port: None,
@@ -1531,17 +1676,15 @@ async fn fetch_and_render_network_status(
                                 error_message: Some(
                                     "Server response could not be parsed".to_string(),
                                 ),
-                                last_updated: result["checked_at"].as_str().map(|s| s.to_string()),
-                                ping: result["ping"].as_f64(),
+                                last_updated: result.checked_at.clone(),
+                                ping: result.ping,
                                 server_version: None,
                                 user_submitted: false,
-                                community: result
-                                    .get("community")
-                                    .and_then(|v| v.as_bool())
-                                    .unwrap_or(false),
+                                community: result.community.unwrap_or(false),
                                 check_id: None,
                                 extra: HashMap::new(),
-                                uptime_30_day: result.get("uptime_30_day").and_then(|v| v.as_f64()),
+                                uptime_30_day: result.uptime_30_day,
+                                placeholder: true,
                             };
 
                             // Try to extract basic information from the raw response_data
@@ -1601,22 +1744,7 @@ async fn fetch_and_render_network_status(
 
                                     // Store any additional fields in extra
                                     for (key, value) in obj {
-                                        if ![
-                                            "host",
-                                            "port",
-                                            "height",
-                                            "status",
-                                            "error",
-                                            "error_type",
-                                            "error_message",
-                                            "last_updated",
-                                            "ping",
-                                            "server_version",
-                                            "user_submitted",
-                                            "check_id",
-                                        ]
-                                        .contains(&key.as_str())
-                                        {
+                                        if !FALLBACK_SERVER_FIELDS.contains(&key.as_str()) {
                                             fallback_server
                                                 .extra
                                                 .insert(key.clone(), value.clone());
@@ -1657,6 +1785,7 @@ async fn fetch_and_render_network_status(
                             check_id: None,
                             extra: HashMap::new(),
                             uptime_30_day: None,
+                            placeholder: true,
                         };
 
                         servers.push(fallback_server);
@@ -1666,8 +1795,14 @@ async fn fetch_and_render_network_status(
         }
     }
 
-    // Sort servers: online first, then by ping (descending), offline servers by hostname
-    servers.sort_by(|a, b| {
+    // Sort servers: online first, then by ping (ascending), offline servers by
+    // hostname. Hostnames are lowercased once per server up front rather than
+    // on every comparison.
+    let mut keyed: Vec<(String, ServerInfo)> = servers
+        .into_iter()
+        .map(|server| (server.host.to_lowercase(), server))
+        .collect();
+    keyed.sort_by(|(a_host, a), (b_host, b)| {
         match (a.is_online(), b.is_online()) {
             (true, true) => {
                 // Both online, sort by ping (ascending) then hostname
@@ -1677,13 +1812,13 @@ async fn fetch_and_render_network_status(
                         ping_a
                             .partial_cmp(&ping_b)
                             .unwrap_or(std::cmp::Ordering::Equal)
-                            .then(a.host.to_lowercase().cmp(&b.host.to_lowercase()))
+                            .then_with(|| a_host.cmp(b_host))
                     }
                     (Some(_), None) => std::cmp::Ordering::Less, // a has ping, b doesn't
                     (None, Some(_)) => std::cmp::Ordering::Greater, // b has ping, a doesn't
                     (None, None) => {
                         // Neither has ping, sort by hostname
-                        a.host.to_lowercase().cmp(&b.host.to_lowercase())
+                        a_host.cmp(b_host)
                     }
                 }
             }
@@ -1691,29 +1826,77 @@ async fn fetch_and_render_network_status(
             (false, true) => std::cmp::Ordering::Greater, // b online, a offline
             (false, false) => {
                 // Both offline, sort by hostname
-                a.host.to_lowercase().cmp(&b.host.to_lowercase())
+                a_host.cmp(b_host)
             }
         }
     });
 
-    // Calculate percentile height
-    let heights: Vec<u64> = servers
-        .iter()
-        .filter(|s| s.height > 0)
-        .map(|s| s.height)
-        .collect();
-    let percentile_height = calculate_percentile(&heights, 90);
-
-    let community_count = servers.iter().filter(|s| s.is_community()).count();
-    let onion_count = servers.iter().filter(|s| s.is_onion()).count();
-    // Outdated filtering only applies to ZEC
-    let is_zec = network.0 == "zec";
-    let outdated_count = if is_zec {
-        servers.iter().filter(|s| s.is_outdated()).count()
-    } else {
-        0
-    };
+    Ok(keyed.into_iter().map(|(_, server)| server).collect())
+}
+
+/// Figures on the network status page that don't depend on its filters.
+/// Computed once per fetch and shared by every filter variant rendered from it.
+struct NetworkSummary {
+    percentile_height: u64,
+    community_count: usize,
+    onion_count: usize,
+    outdated_count: usize,
+    /// Whether each server, in fetch order, is below the minimum supported
+    /// version. Always false outside ZEC.
+    outdated: Vec<bool>,
+}
+
+impl NetworkSummary {
+    fn new(servers: &[ServerInfo], network: &SafeNetwork) -> Self {
+        // Outdated filtering only applies to ZEC
+        let is_zec = network.0 == "zec";
+
+        // Collect heights for the percentile, the filter badge counts and the
+        // outdated flags in a single pass over the servers
+        let mut heights = Vec::with_capacity(servers.len());
+        let mut community_count = 0;
+        let mut onion_count = 0;
+        let mut outdated_count = 0;
+        let mut outdated = Vec::with_capacity(servers.len());
+        for server in servers {
+            if server.height > 0 {
+                heights.push(server.height);
+            }
+            if server.is_community() {
+                community_count += 1;
+            }
+            if server.is_onion() {
+                onion_count += 1;
+            }
+            let is_outdated = is_zec && server.is_outdated();
+            if is_outdated {
+                outdated_count += 1;
+            }
+            outdated.push(is_outdated);
+        }
+
+        Self {
+            percentile_height: calculate_percentile(&mut heights, 90),
+            community_count,
+            onion_count,
+            outdated_count,
+            outdated,
+        }
+    }
+}
 
+/// Render the network status page for one combination of filters.
+#[allow(clippy::too_many_arguments)]
+fn render_network_status(
+    servers: &[ServerInfo],
+    summary: &NetworkSummary,
+    network: &SafeNetwork,
+    hide_community: bool,
+    tor_only: bool,
+    show_outdated: bool,
+    operator: Option<&str>,
+    at: Option<DateTime<Utc>>,
+) -> Result<String> {
     // Secret operator filter: `?operator=zecrocks` shows only zec.rocks-operated
     // servers (clearnet + onion), including outdated ones (overrides the
     // show_outdated, hide_community and tor_only filters).
@@ -1721,31 +1904,33 @@ async fn fetch_and_render_network_status(
 
     // Filter servers based on hide_community, tor_only, and show_outdated flags
     let filtered_servers = servers
-        .into_iter()
-        .filter(|s| {
+        .iter()
+        .zip(&summary.outdated)
+        .filter(|&(s, &outdated)| {
             if zecrocks_only {
                 return s.is_zecrocks();
             }
             let passes_community_filter = !hide_community || !s.is_community();
             let passes_tor_filter = !tor_only || s.is_onion();
-            let passes_outdated_filter = show_outdated || !is_zec || !s.is_outdated();
+            let passes_outdated_filter = show_outdated || !outdated;
             passes_community_filter && passes_tor_filter && passes_outdated_filter
         })
+        .map(|(s, _)| s)
         .collect::<Vec<_>>();
 
     let total_count = filtered_servers.len();
 
     let template = IndexTemplate {
         servers: filtered_servers,
-        percentile_height,
+        percentile_height: summary.percentile_height,
         current_network: network.0,
         total_count,
-        community_count,
+        community_count: summary.community_count,
         hide_community,
         tor_only,
         show_outdated,
-        outdated_count,
-        onion_count,
+        outdated_count: summary.outdated_count,
+        onion_count: summary.onion_count,
         historical_at: format_historical_timestamp(at),
     };
 
@@ -1759,6 +1944,7 @@ async fn fetch_and_render_network_status(
 
 #[get("/{network}")]
 async fn network_status(
+    req: HttpRequest,
     worker: web::Data<Worker>,
     network: web::Path<String>,
     query_params: web::Query<IndexQuery>,
@@ -1780,23 +1966,52 @@ async fn network_status(
     }
 
     // For historical queries, and secret operator views (e.g. ?operator=zecrocks),
-    // bypass the pre-warmed cache and query ClickHouse directly. These are
-    // low-traffic and not part of the warmed cache key set.
+    // bypass the pre-warmed cache and query ClickHouse on demand. These are
+    // low-traffic and not part of the warmed cache key set, but a shared link
+    // can still be hit repeatedly, so the rendered page is kept briefly.
     if historical_at.is_some() || operator.is_some() {
-        info!(
-            "Direct query for {} at {:?} operator={:?}",
-            network.0, historical_at, operator
-        );
-        let html = fetch_and_render_network_status(
-            &worker,
-            &network,
+        let cache_key = direct_view_cache_key(
+            network.0,
             hide_community,
             tor_only,
             show_outdated,
             operator,
             historical_at,
-        )
-        .await?;
+        );
+        let cached = worker
+            .cache
+            .read()
+            .await
+            .get(&cache_key)
+            .filter(|entry| entry.timestamp.elapsed() < ON_DEMAND_CACHE_TTL)
+            .map(|entry| entry.html.clone());
+
+        let html = match cached {
+            Some(html) => {
+                debug!("Serving {} from cache", cache_key);
+                html
+            }
+            None => {
+                info!(
+                    "Direct query for {} at {:?} operator={:?}",
+                    network.0, historical_at, operator
+                );
+                let html = fetch_and_render_network_status(
+                    &worker,
+                    &network,
+                    hide_community,
+                    tor_only,
+                    show_outdated,
+                    operator,
+                    historical_at,
+                )
+                .await?;
+                let entry = CacheEntry::new(html);
+                let html = entry.html.clone();
+                worker.cache.write().await.insert(cache_key, entry);
+                html
+            }
+        };
         return Ok(HttpResponse::Ok()
             .content_type("text/html; charset=utf-8")
             .insert_header(("X-Historical-At", query_params.at.as_deref().unwrap_or("")))
@@ -1806,23 +2021,29 @@ async fn network_status(
 
     // ONLY serve from cache - never trigger ClickHouse queries from user requests
     // This prevents traffic spikes from overwhelming ClickHouse
-    let cache_key = format!(
-        "{}-{}-{}-{}",
-        network.0, hide_community, tor_only, show_outdated
-    );
+    let cache_key = page_cache_key(network.0, hide_community, tor_only, show_outdated);
 
     let cache = worker.cache.read().await;
     if let Some(entry) = cache.get(&cache_key) {
         // Serve cache regardless of age - background task keeps it fresh
         // Add X-Cache-Age header for debugging
         let cache_age_secs = entry.timestamp.elapsed().as_secs();
-        info!(
+        debug!(
             "Serving {} from cache (age: {}s)",
             cache_key, cache_age_secs
         );
 
+        if is_not_modified(&req, entry) {
+            return Ok(HttpResponse::NotModified()
+                .insert_header((header::ETAG, entry.etag.clone()))
+                .insert_header(("X-Cache-Age", cache_age_secs.to_string()))
+                .insert_header(("Cache-Control", "public, max-age=10, s-maxage=10"))
+                .finish());
+        }
+
         return Ok(HttpResponse::Ok()
             .content_type("text/html; charset=utf-8")
+            .insert_header((header::ETAG, entry.etag.clone()))
             .insert_header(("X-Cache-Age", cache_age_secs.to_string()))
             .insert_header(("Cache-Control", "public, max-age=10, s-maxage=10"))
             .body(entry.html.clone()));
@@ -1859,6 +2080,7 @@ async fn network_status(
 
 #[get("/{network}/{host}")]
 async fn server_detail(
+    req: HttpRequest,
     worker: web::Data<Worker>,
     path: web::Path<(String, String)>,
     query_params: web::Query<ServerDetailQuery>,
@@ -1890,179 +2112,210 @@ async fn server_detail(
         validate_timestamp_bounds(at).map_err(actix_web::error::ErrorBadRequest)?;
     }
 
+    // Current (non-historical) pages are served from a short-lived cache so
+    // repeated views of the same server don't each run four ClickHouse queries.
+    let cache_key = server_detail_cache_key(safe_network.0, &host, port);
+    if historical_at.is_none() {
+        let cache = worker.cache.read().await;
+        if let Some(entry) = cache.get(&cache_key) {
+            let cache_age = entry.timestamp.elapsed();
+            if cache_age < ON_DEMAND_CACHE_TTL {
+                debug!(
+                    "Serving {} from cache (age: {}s)",
+                    cache_key,
+                    cache_age.as_secs()
+                );
+
+                if is_not_modified(&req, entry) {
+                    return Ok(HttpResponse::NotModified()
+                        .insert_header((header::ETAG, entry.etag.clone()))
+                        .insert_header(("X-Cache-Age", cache_age.as_secs().to_string()))
+                        .insert_header(("Cache-Control", "public, max-age=10, s-maxage=10"))
+                        .finish());
+                }
+
+                return Ok(HttpResponse::Ok()
+                    .content_type("text/html; charset=utf-8")
+                    .insert_header((header::ETAG, entry.etag.clone()))
+                    .insert_header(("X-Cache-Age", cache_age.as_secs().to_string()))
+                    .insert_header(("Cache-Control", "public, max-age=10, s-maxage=10"))
+                    .body(entry.html.clone()));
+            }
+        }
+    }
+
     // Generate time reference for SQL queries
     let time_ref = time_reference_sql(historical_at);
+    // Host and port are bound as ClickHouse query parameters, not spliced into SQL
+    let params = host_query_params(&host, port);
     let upper_bound = if historical_at.is_some() {
         format!("AND r.checked_at <= {}", time_ref)
     } else {
         String::new()
     };
 
-    // Query the targets table to get server information
+    // Fetch the most recent result for this server. Only one row is used, so
+    // let ClickHouse stop at the newest match instead of ranking every row in
+    // the results window with ROW_NUMBER(). The page is built entirely from
+    // response_data, so that is the only column returned.
     let query = format!(
         r#"
-        WITH latest_results AS (
-            SELECT
-                r.*,
-                ROW_NUMBER() OVER (PARTITION BY r.hostname, r.port ORDER BY r.checked_at DESC) as rn
-            FROM {db}.results r
-            WHERE r.checker_module = '{network}'
-            AND r.hostname = '{host}'
-            AND r.checked_at >= {time_ref} - INTERVAL {window} DAY
-            {upper_bound}
-            {port_filter}
-        )
         SELECT
-            hostname,
-            checked_at,
-            status,
-            ping_ms as ping,
-            response_data
-        FROM latest_results
-        WHERE rn = 1
+            r.response_data
+        FROM {db}.results r
+        WHERE r.checker_module = '{network}'
+        AND r.hostname = {{host:String}}
+        AND r.checked_at >= {time_ref} - INTERVAL {window} DAY
+        {upper_bound}
+        {port_filter}
+        ORDER BY r.checked_at DESC
+        LIMIT 1
         FORMAT JSONEachRow
         "#,
         db = worker.clickhouse.database,
         network = safe_network.0,
-        host = host,
         window = worker.config.results_window_days,
         time_ref = time_ref,
         upper_bound = upper_bound,
-        port_filter = if let Some(port_num) = port {
-            format!("AND r.port = {}", port_num)
+        port_filter = if port.is_some() {
+            "AND r.port = {port:UInt16}"
         } else {
-            String::new()
+            ""
         }
     );
 
-    let response = worker
-        .http_client
-        .post(&worker.clickhouse.url)
-        .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
-        .header("Content-Type", "text/plain")
-        .body(query.clone())
-        .send()
-        .await
-        .map_err(|e| {
-            error!("ClickHouse query error: {}", e);
-            actix_web::error::ErrorInternalServerError("Database query failed")
-        })?;
-
-    let status = response.status();
-    let body = response.text().await.map_err(|e| {
-        error!("Failed to read response body: {}", e);
-        actix_web::error::ErrorInternalServerError("Failed to read database response")
-    })?;
-
-    if !status.is_success() {
-        error!("ClickHouse query failed with status {}: {}", status, body);
-        return Err(actix_web::error::ErrorInternalServerError(
-            "Database query failed",
-        ));
-    }
-
-    // Parse the response data
-    let mut data: HashMap<String, Value> = HashMap::new();
-    if !body.trim().is_empty() {
-        if let Ok(result) = serde_json::from_str::<serde_json::Value>(body.lines().next().unwrap())
-        {
-            if let Some(response_data) = result["response_data"].as_str() {
-                if let Ok(parsed_data) =
-                    serde_json::from_str::<HashMap<String, Value>>(response_data)
-                {
-                    data = parsed_data;
-                }
-            }
-        }
-    }
-
-    // Get total count and heights for percentile calculation
+    // Get heights for percentile calculation. Read the extracted block_height
+    // column instead of shipping response_data back and parsing it per row.
     let count_query = format!(
         r#"
         WITH latest_results AS (
             SELECT
-                r.*,
+                r.hostname,
+                r.block_height,
                 ROW_NUMBER() OVER (PARTITION BY r.hostname, r.port ORDER BY r.checked_at DESC) as rn
             FROM {db}.results r
             WHERE r.checker_module = '{network}'
-            AND r.hostname = '{host}'
+            AND r.hostname = {{host:String}}
             AND r.checked_at >= {time_ref} - INTERVAL 1 DAY
             {upper_bound}
             {port_filter}
         )
         SELECT
-            hostname,
-            response_data
+            block_height
         FROM latest_results
-        WHERE rn = 1
+        WHERE rn = 1 AND block_height > 0
         FORMAT JSONEachRow
         "#,
         db = worker.clickhouse.database,
         network = safe_network.0,
-        host = host,
         time_ref = time_ref,
         upper_bound = upper_bound,
-        port_filter = if let Some(port_num) = port {
-            format!("AND r.port = {}", port_num)
+        port_filter = if port.is_some() {
+            "AND r.port = {port:UInt16}"
         } else {
-            String::new()
+            ""
         }
     );
 
-    let count_response = worker
-        .http_client
-        .post(&worker.clickhouse.url)
-        .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
-        .header("Content-Type", "text/plain")
-        .body(count_query)
-        .send()
-        .await
-        .map_err(|e| {
-            error!("ClickHouse query error: {}", e);
-            actix_web::error::ErrorInternalServerError("Database query failed")
+    let latest_result = async {
+        let response = worker
+            .http_client
+            .post(&worker.clickhouse.url)
+            .query(&ON_DEMAND_QUERY_SETTINGS)
+            .query(&params)
+            .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
+            .header("Content-Type", "text/plain")
+            .body(query)
+            .send()
+            .await
+            .map_err(|e| {
+                error!("ClickHouse query error: {}", e);
+                actix_web::error::ErrorInternalServerError("Database query failed")
+            })?;
+
+        let status = response.status();
+        let body = response.text().await.map_err(|e| {
+            error!("Failed to read response body: {}", e);
+            actix_web::error::ErrorInternalServerError("Failed to read database response")
         })?;
 
-    let count_body = count_response.text().await.map_err(|e| {
-        error!("Failed to read response body: {}", e);
-        actix_web::error::ErrorInternalServerError("Failed to read database response")
-    })?;
+        if !status.is_success() {
+            error!("ClickHouse query failed with status {}: {}", status, body);
+            return Err(actix_web::error::ErrorInternalServerError(
+                "Database query failed",
+            ));
+        }
 
-    let mut heights = Vec::new();
+        Ok::<_, actix_web::Error>(body)
+    };
 
-    for line in count_body.lines() {
-        if line.trim().is_empty() {
-            continue;
-        }
+    let latest_heights = async {
+        let count_response = worker
+            .http_client
+            .post(&worker.clickhouse.url)
+            .query(&ON_DEMAND_QUERY_SETTINGS)
+            .query(&params)
+            .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
+            .header("Content-Type", "text/plain")
+            .body(count_query)
+            .send()
+            .await
+            .map_err(|e| {
+                error!("ClickHouse query error: {}", e);
+                actix_web::error::ErrorInternalServerError("Database query failed")
+            })?;
 
-        if let Ok(result) = serde_json::from_str::<serde_json::Value>(line) {
-            if let Some(response_data) = result["response_data"].as_str() {
-                if let Ok(server_data) = serde_json::from_str::<Value>(response_data) {
-                    if let Some(height) = server_data.get("height").and_then(|h| h.as_u64()) {
-                        if height > 0 {
-                            heights.push(height);
-                        }
-                    }
-                }
-            }
-        }
-    }
+        let count_body = count_response.text().await.map_err(|e| {
+            error!("Failed to read response body: {}", e);
+            actix_web::error::ErrorInternalServerError("Failed to read database response")
+        })?;
 
-    let percentile_height = calculate_percentile(&heights, 90);
+        let heights: Vec<u64> = count_body
+            .lines()
+            .filter(|line| !line.trim().is_empty())
+            .filter_map(|line| serde_json::from_str::<Value>(line).ok())
+            .filter_map(|result| json_u64(&result["block_height"]))
+            .collect();
 
-    // Calculate uptime statistics
-    let uptime_stats =
-        calculate_uptime_stats(&worker, &host, &network, port, historical_at).await?;
+        Ok::<_, actix_web::Error>(heights)
+    };
 
-    // Create sorted data for alphabetical display
-    let mut sorted_data: Vec<(String, Value)> =
-        data.iter().map(|(k, v)| (k.clone(), v.clone())).collect();
-    sorted_data.sort_by(|a, b| a.0.cmp(&b.0));
+    // The latest result, recent heights and uptime statistics don't depend on
+    // each other, so issue them together rather than paying for each round
+    // trip to ClickHouse in turn.
+    let (body, mut heights, uptime_stats) = tokio::try_join!(
+        latest_result,
+        latest_heights,
+        calculate_uptime_stats(&worker, &host, &network, port, historical_at),
+    )?;
 
-    // Extract donation_address if it exists
-    let donation_opt = data.get("donation_address").and_then(|v| v.as_str());
+    // Parse the response data
+    let mut data: HashMap<String, Value> = HashMap::new();
+    if !body.trim().is_empty() {
+        if let Ok(result) = serde_json::from_str::<serde_json::Value>(body.lines().next().unwrap())
+        {
+            if let Some(response_data) = result["response_data"].as_str() {
+                if let Ok(parsed_data) =
+                    serde_json::from_str::<HashMap<String, Value>>(response_data)
+                {
+                    data = parsed_data;
+                }
+            }
+        }
+    }
+
+    let percentile_height = calculate_percentile(&mut heights, 90);
+
+    // Extract donation_address if it exists
+    let donation_opt = data.get("donation_address").and_then(|v| v.as_str());
     let donation_address = donation_opt.unwrap_or("").to_string();
     let show_donation = !donation_address.trim().is_empty();
 
+    // Create sorted data for alphabetical display. Move the entries out of
+    // the map instead of cloning every key and value.
+    let mut sorted_data: Vec<(String, Value)> = data.into_iter().collect();
+    sorted_data.sort_unstable_by(|a, b| a.0.cmp(&b.0));
+
     // Generate QR code SVG for donation address
     let donation_qr_code = if show_donation {
         match QrCode::new(&donation_address) {
@@ -2097,25 +2350,29 @@ async fn server_detail(
         actix_web::error::ErrorInternalServerError("Template rendering failed")
     })?;
 
-    let mut response = HttpResponse::Ok();
-    response.content_type("text/html; charset=utf-8");
-
     if historical_at.is_some() {
-        response.insert_header(("X-Historical-At", query_params.at.as_deref().unwrap_or("")));
-        response.insert_header(("Cache-Control", "no-cache"));
-    } else {
-        response.insert_header(("Cache-Control", "public, max-age=10, s-maxage=10"));
+        return Ok(HttpResponse::Ok()
+            .content_type("text/html; charset=utf-8")
+            .insert_header(("X-Historical-At", query_params.at.as_deref().unwrap_or("")))
+            .insert_header(("Cache-Control", "no-cache"))
+            .body(html));
     }
 
-    Ok(response.body(html))
+    let entry = CacheEntry::new(html);
+    let etag = entry.etag.clone();
+    worker.cache.write().await.insert(cache_key, entry.clone());
+
+    Ok(HttpResponse::Ok()
+        .content_type("text/html; charset=utf-8")
+        .insert_header((header::ETAG, etag))
+        .insert_header(("Cache-Control", "public, max-age=10, s-maxage=10"))
+        .body(entry.html))
 }
 
 #[derive(Debug, Deserialize)]
 struct NetworkApiQuery {
     /// Historical timestamp for time-travel queries
     at: Option<String>,
-    /// Optional limit on number of servers returned
-    limit: Option<usize>,
     /// Filter servers by chain: "main"/"mainnet" or "test"/"testnet"
     chain: Option<String>,
 }
@@ -2134,26 +2391,109 @@ fn parse_chain_filter(chain: Option<&str>) -> std::result::Result<Option<&'stati
     }
 }
 
-/// Filter a serialized API response down to servers on the given chain.
-/// Servers that don't report a chain (e.g. BTC Electrum) count as mainnet.
-fn filter_api_json_by_chain(json: &str, chain: &str) -> std::result::Result<String, String> {
-    let mut value: serde_json::Value =
-        serde_json::from_str(json).map_err(|e| format!("Failed to parse API JSON: {}", e))?;
+/// Serialize the API response, optionally keeping only servers on the given
+/// chain. Servers that don't report a chain (e.g. BTC Electrum) count as mainnet.
+fn api_json_for_chain(
+    servers: &[ApiServerInfo],
+    chain: Option<&str>,
+) -> std::result::Result<String, String> {
+    let servers = servers
+        .iter()
+        .filter(|s| chain.is_none_or(|chain| s.chain.as_deref().unwrap_or("main") == chain))
+        .collect();
+
+    serde_json::to_string(&ApiResponse { servers })
+        .map_err(|e| format!("Failed to serialize API response: {}", e))
+}
+
+/// Chains that get a pre-filtered copy of the API response in the cache.
+const API_CACHE_CHAINS: &[&str] = &["main", "test"];
+
+/// Cache key for a network's API response, optionally filtered to one chain.
+fn api_cache_key(network: &str, chain: Option<&str>) -> String {
+    match chain {
+        Some(chain) => format!("{}-api-{}", network, chain),
+        None => format!("{}-api", network),
+    }
+}
+
+/// Cache key for a historical API response. Like historical pages, these
+/// share the on-demand prefix so the refresh cycle prunes them.
+fn direct_api_cache_key(network: &str, chain: Option<&str>, at: DateTime<Utc>) -> String {
+    format!(
+        "{}{}-{}",
+        DIRECT_VIEW_CACHE_PREFIX,
+        api_cache_key(network, chain),
+        at.timestamp_millis()
+    )
+}
 
-    if let Some(servers) = value.get_mut("servers").and_then(|s| s.as_array_mut()) {
-        servers.retain(|s| s.get("chain").and_then(|c| c.as_str()).unwrap_or("main") == chain);
+/// Store a network's API response in the cache, together with one filtered
+/// copy per chain. Each copy is serialized straight from the server list, so
+/// no response is parsed back out of JSON.
+async fn cache_api_json(worker: &Worker, network: &str, servers: &[ApiServerInfo]) {
+    let mut entries = Vec::with_capacity(API_CACHE_CHAINS.len() + 1);
+    for chain in std::iter::once(None).chain(API_CACHE_CHAINS.iter().copied().map(Some)) {
+        match api_json_for_chain(servers, chain) {
+            Ok(json) => entries.push((api_cache_key(network, chain), CacheEntry::new(json))),
+            Err(e) => error!(
+                "Failed to build {} cache for {}: {}",
+                api_cache_key(network, chain),
+                network,
+                e
+            ),
+        }
     }
 
-    serde_json::to_string(&value).map_err(|e| format!("Failed to serialize API JSON: {}", e))
+    // The entries (and their ETag hashes) are built above, so the write lock
+    // that blocks every cached read is only held for the inserts
+    worker.cache.write().await.extend(entries);
 }
 
-/// Fetch and serialize the JSON API response for a network.
-/// Used by both the cache refresh task and direct (historical) requests.
-async fn fetch_api_json(
+/// Convert a parsed server row into its JSON API shape. Borrows the row and
+/// copies only the fields the API reports, so the refresh can convert the
+/// rows it also renders without cloning each whole `ServerInfo`.
+fn to_api_server(server: &ServerInfo, network: &SafeNetwork) -> ApiServerInfo {
+    let spec = network.spec();
+    let non_blank = |s: &&str| !s.trim().is_empty();
+    let node_version = match network.0 {
+        "zec" => extra_str(&server.extra, "zcashd_subversion").map(|s| s.replace('/', "")),
+        "btc" => server.server_version.clone(),
+        _ => None,
+    };
+
+    ApiServerInfo {
+        hostname: server.host.clone(),
+        port: server.port.unwrap_or(spec.default_port),
+        protocol: spec.api_protocol,
+        ping: server.ping,
+        online: server.is_online(),
+        community: server.community,
+        height: server.height,
+        chain: extra_str(&server.extra, "chain_name")
+            .filter(non_blank)
+            .map(str::to_string),
+        uptime_30d: server.uptime_30_day.map(|p| p / 100.0),
+        first_seen: extra_str(&server.extra, "first_seen").map(str::to_string),
+        lightwallet_server_version: server.server_version.clone(),
+        node_version,
+        consensus_branch_id: extra_str(&server.extra, "consensus_branch_id")
+            .filter(non_blank)
+            .map(str::to_string),
+        donation_address: extra_str(&server.extra, "donation_address")
+            .filter(non_blank)
+            .map(str::to_string),
+    }
+}
+
+/// Fetch the servers for a network's JSON API response.
+/// Used for historical requests and to fill the cache on a startup miss;
+/// the refresh task builds the API cache from the page fetch instead.
+async fn fetch_api_servers(
     worker: &Worker,
     network: &SafeNetwork,
     historical_at: Option<DateTime<Utc>>,
-) -> std::result::Result<String, String> {
+) -> std::result::Result<Vec<ApiServerInfo>, String> {
     // Generate time reference for SQL queries
     let time_ref = time_reference_sql(historical_at);
     let upper_bound = if historical_at.is_some() {
@@ -2176,23 +2516,34 @@ async fn fetch_api_json(
         FROM (
             WITH latest_results AS (
                 SELECT
-                    r.*,
+                    r.hostname,
+                    r.port,
+                    r.checker_module,
+                    r.response_data,
                     ROW_NUMBER() OVER (PARTITION BY r.hostname, r.port ORDER BY r.checked_at DESC) as rn
                 FROM {db}.results r
-                WHERE r.checker_module = '{network}'
+                PREWHERE r.checker_module = '{network}'
                 AND r.checked_at >= {time_ref} - INTERVAL {window} DAY
                 {upper_bound}
+                -- Only rank rows for registered targets; the targets join below
+                -- would drop the rest anyway
+                WHERE (r.hostname, r.port) IN (
+                    SELECT hostname, port FROM {db}.targets WHERE module = '{network}'
+                )
             ),
             -- Calculate first_seen and percentage of month for each server
+            -- Read from the hourly uptime_stats_by_port rollup instead of taking
+            -- min() over the network's entire results history. Truncating to the
+            -- hour doesn't change the hour-based dateDiff, and the rollup has the
+            -- same (hostname, port) keys the uptime join below uses.
             first_seen_per_server AS (
                 SELECT
                     hostname,
-                    toString(port) as port,
-                    min(checked_at) as first_seen,
-                    least(dateDiff('hour', min(checked_at), {time_ref}), 720) / 720.0 as percentage_of_month
-                FROM {db}.results
-                WHERE checker_module = '{network}'
-                AND checked_at <= {time_ref}
+                    port,
+                    min(time_bucket) as first_seen,
+                    least(dateDiff('hour', min(time_bucket), {time_ref}), 720) / 720.0 as percentage_of_month
+                FROM {db}.uptime_stats_by_port
+                WHERE time_bucket <= {time_ref}
                 GROUP BY hostname, port
             ),
             uptime_window AS (
@@ -2207,11 +2558,8 @@ async fn fetch_api_json(
                 {uptime_upper_bound}
                 GROUP BY u.hostname, u.port, fs.percentage_of_month
             )
+            -- Everything else the API reports is read from response_data
             SELECT
-                lr.hostname as hostname,
-                lr.checked_at,
-                lr.status,
-                lr.ping_ms as ping,
                 lr.response_data,
                 u30.uptime_percentage as uptime_30_day,
                 t.community
@@ -2223,7 +2571,6 @@ async fn fetch_api_json(
             WHERE lr.rn = 1 AND t.hostname != ''
         )
         FORMAT JSONEachRow
-        SETTINGS max_execution_time = 10
         "#,
         db = worker.clickhouse.database,
         network = network.0,
@@ -2233,9 +2580,10 @@ async fn fetch_api_json(
         uptime_upper_bound = uptime_upper_bound,
     );
 
-    let response = worker
+    let mut response = worker
         .http_client
         .post(&worker.clickhouse.url)
+        .query(&ON_DEMAND_QUERY_SETTINGS)
         .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
         .header("Content-Type", "text/plain")
         .body(query)
@@ -2243,15 +2591,16 @@ async fn fetch_api_json(
         .await
         .map_err(|e| format!("ClickHouse connection error for {}: {:?}", network.0, e))?;
 
-    let status = response.status();
-    let body = response.text().await.map_err(|e| {
+    let read_error = |e: reqwest::Error| {
         format!(
             "Failed to read ClickHouse response body for {}: {:?}",
             network.0, e
         )
-    })?;
+    };
 
+    let status = response.status();
     if !status.is_success() {
+        let body = response.text().await.map_err(read_error)?;
         return Err(format!(
             "ClickHouse query failed for {} with status {}: {}",
             network.0,
@@ -2264,99 +2613,56 @@ async fn fetch_api_json(
         ));
     }
 
-    let mut servers = Vec::new();
-    for line in body.lines() {
-        if line.trim().is_empty() {
-            continue;
-        }
+    // Convert each row as its chunk arrives rather than buffering the whole
+    // body first, so decoding overlaps the transfer and only the current
+    // partial row is held in memory alongside the results
+    let mut api_servers = Vec::new();
+    let mut pending = Vec::new();
+    while let Some(chunk) = response.chunk().await.map_err(read_error)? {
+        pending.extend_from_slice(&chunk);
+        drain_complete_lines(&mut pending, |line| {
+            api_servers.extend(api_server_from_row(line, network));
+        });
+    }
+    // The last row may not be newline-terminated
+    api_servers.extend(api_server_from_row(&pending, network));
 
-        if let Ok(result) = serde_json::from_str::<serde_json::Value>(line) {
-            if let Some(response_data) = result["response_data"].as_str() {
-                if let Ok(mut server_info) = serde_json::from_str::<ServerInfo>(response_data) {
-                    server_info.uptime_30_day =
-                        result.get("uptime_30_day").and_then(|v| v.as_f64());
-                    server_info.community = result
-                        .get("community")
-                        .and_then(|v| v.as_bool())
-                        .unwrap_or(false);
-
-                    if let Some(first_seen_str) = result.get("first_seen").and_then(|v| v.as_str())
-                    {
-                        server_info.extra.insert(
-                            "first_seen".to_string(),
-                            serde_json::Value::String(first_seen_str.to_string()),
-                        );
-                    }
+    Ok(api_servers)
+}
 
-                    servers.push(server_info);
-                }
-            }
-        }
+/// Call `f` with each complete newline-terminated line at the front of
+/// `buffer`, then remove those lines, leaving any trailing partial line in
+/// place for the next chunk to complete.
+fn drain_complete_lines(buffer: &mut Vec<u8>, mut f: impl FnMut(&[u8])) {
+    let mut start = 0;
+    while let Some(len) = buffer[start..].iter().position(|&b| b == b'\n') {
+        f(&buffer[start..start + len]);
+        start += len + 1;
     }
+    buffer.drain(..start);
+}
 
-    let api_servers: Vec<ApiServerInfo> = servers
-        .into_iter()
-        .map(|server| {
-            let (port, protocol) = match network.0 {
-                "btc" => (server.port.unwrap_or(50002), "ssl"),
-                "zec" => (server.port.unwrap_or(443), "grpc"),
-                _ => unreachable!(),
-            };
-
-            ApiServerInfo {
-                hostname: server.host.clone(),
-                port,
-                protocol,
-                ping: server.ping,
-                online: server.is_online(),
-                community: server.community,
-                height: server.height,
-                chain: server
-                    .extra
-                    .get("chain_name")
-                    .and_then(|v| v.as_str())
-                    .filter(|s| !s.trim().is_empty())
-                    .map(|s| s.to_string()),
-                uptime_30d: server.uptime_30_day.map(|p| p / 100.0),
-                first_seen: server
-                    .extra
-                    .get("first_seen")
-                    .and_then(|v| v.as_str())
-                    .map(|s| s.to_string()),
-                lightwallet_server_version: server.server_version.clone(),
-                node_version: match network.0 {
-                    "zec" => server
-                        .extra
-                        .get("zcashd_subversion")
-                        .and_then(|v| v.as_str())
-                        .map(|s| s.replace('/', "")),
-                    "btc" => server.server_version.clone(),
-                    _ => None,
-                },
-                consensus_branch_id: server
-                    .extra
-                    .get("consensus_branch_id")
-                    .and_then(|v| v.as_str())
-                    .filter(|s| !s.trim().is_empty())
-                    .map(|s| s.to_string()),
-                donation_address: server
-                    .extra
-                    .get("donation_address")
-                    .and_then(|v| v.as_str())
-                    .filter(|s| !s.trim().is_empty())
-                    .map(|s| s.to_string()),
-            }
-        })
-        .collect();
+/// Convert one JSONEachRow line of the API status query into an API server
+/// entry. Blank lines and rows that don't parse yield `None`.
+fn api_server_from_row(line: &[u8], network: &SafeNetwork) -> Option<ApiServerInfo> {
+    let result = serde_json::from_slice::<StatusRow>(line).ok()?;
+    let mut server_info =
+        serde_json::from_str::<ServerInfo>(result.response_data.as_deref()?).ok()?;
+    server_info.uptime_30_day = result.uptime_30_day;
+    server_info.community = result.community.unwrap_or(false);
+
+    if let Some(first_seen) = result.first_seen {
+        server_info
+            .extra
+            .insert("first_seen".to_string(), Value::String(first_seen));
+    }
 
-    serde_json::to_string(&ApiResponse {
-        servers: api_servers,
-    })
-    .map_err(|e| format!("Failed to serialize API response: {}", e))
+    Some(to_api_server(&server_info, network))
 }
 
 #[get("/api/v0/{network}.json")]
 async fn network_api(
+    req: HttpRequest,
     worker: web::Data<Worker>,
     network: web::Path<String>,
     query_params: web::Query<NetworkApiQuery>,
@@ -2375,21 +2681,41 @@ async fn network_api(
     let chain_filter = parse_chain_filter(query_params.chain.as_deref())
         .map_err(actix_web::error::ErrorBadRequest)?;
 
-    // For historical or limited queries, bypass cache and query directly
-    if historical_at.is_some() || query_params.limit.is_some() {
-        let json = fetch_api_json(&worker, &network, historical_at)
+    // For historical queries, bypass the pre-warmed cache and query directly.
+    // Like historical pages, the response is kept briefly so repeated polls
+    // of the same timestamp don't each rerun the query.
+    if let Some(at) = historical_at {
+        let cache_key = direct_api_cache_key(network.0, chain_filter, at);
+        let cached = worker
+            .cache
+            .read()
             .await
-            .map_err(|e| {
-                error!("{}", e);
-                actix_web::error::ErrorInternalServerError(
-                    serde_json::json!({"error": "Database query failed"}).to_string(),
-                )
-            })?;
-
-        let json = match chain_filter {
-            Some(chain) => filter_api_json_by_chain(&json, chain)
-                .map_err(actix_web::error::ErrorInternalServerError)?,
-            None => json,
+            .get(&cache_key)
+            .filter(|entry| entry.timestamp.elapsed() < ON_DEMAND_CACHE_TTL)
+            .map(|entry| entry.html.clone());
+
+        let json = match cached {
+            Some(json) => {
+                debug!("Serving {} from cache", cache_key);
+                json
+            }
+            None => {
+                let servers = fetch_api_servers(&worker, &network, historical_at)
+                    .await
+                    .map_err(|e| {
+                        error!("{}", e);
+                        actix_web::error::ErrorInternalServerError(
+                            serde_json::json!({"error": "Database query failed"}).to_string(),
+                        )
+                    })?;
+
+                let json = api_json_for_chain(&servers, chain_filter)
+                    .map_err(actix_web::error::ErrorInternalServerError)?;
+                let entry = CacheEntry::new(json);
+                let json = entry.html.clone();
+                worker.cache.write().await.insert(cache_key, entry);
+                json
+            }
         };
 
         return Ok(HttpResponse::Ok()
@@ -2398,28 +2724,32 @@ async fn network_api(
             .body(json));
     }
 
-    // For current (non-historical) requests, serve from cache
-    let cache_key = format!("{}-api", network.0);
+    // For current (non-historical) requests, serve from cache. Chain-filtered
+    // variants are pre-built by cache_api_json, so this is a plain lookup.
+    let cache_key = api_cache_key(network.0, chain_filter);
 
     let cache = worker.cache.read().await;
     if let Some(entry) = cache.get(&cache_key) {
         let cache_age_secs = entry.timestamp.elapsed().as_secs();
-        info!(
+        debug!(
             "Serving {} from cache (age: {}s)",
             cache_key, cache_age_secs
         );
 
-        let json = match chain_filter {
-            Some(chain) => filter_api_json_by_chain(&entry.html, chain)
-                .map_err(actix_web::error::ErrorInternalServerError)?,
-            None => entry.html.clone(),
-        };
+        if is_not_modified(&req, entry) {
+            return Ok(HttpResponse::NotModified()
+                .insert_header((header::ETAG, entry.etag.clone()))
+                .insert_header(("X-Cache-Age", cache_age_secs.to_string()))
+                .insert_header(("Cache-Control", "public, max-age=10, s-maxage=10"))
+                .finish());
+        }
 
         return Ok(HttpResponse::Ok()
             .content_type("application/json")
+            .insert_header((header::ETAG, entry.etag.clone()))
             .insert_header(("X-Cache-Age", cache_age_secs.to_string()))
             .insert_header(("Cache-Control", "public, max-age=10, s-maxage=10"))
-            .body(json));
+            .body(entry.html.clone()));
     }
     drop(cache);
 
@@ -2430,23 +2760,13 @@ async fn network_api(
         cache_key
     );
 
-    match fetch_api_json(&worker, &network, None).await {
-        Ok(json) => {
-            // Populate cache for next request (always unfiltered)
-            let mut cache = worker.cache.write().await;
-            cache.insert(
-                cache_key,
-                CacheEntry {
-                    html: json.clone(),
-                    timestamp: std::time::Instant::now(),
-                },
-            );
+    match fetch_api_servers(&worker, &network, None).await {
+        Ok(servers) => {
+            // Populate cache (unfiltered and per-chain) for next request
+            cache_api_json(&worker, network.0, &servers).await;
 
-            let json = match chain_filter {
-                Some(chain) => filter_api_json_by_chain(&json, chain)
-                    .map_err(actix_web::error::ErrorInternalServerError)?,
-                None => json,
-            };
+            let json = api_json_for_chain(&servers, chain_filter)
+                .map_err(actix_web::error::ErrorInternalServerError)?;
 
             Ok(HttpResponse::Ok()
                 .content_type("application/json")
@@ -2502,148 +2822,74 @@ async fn get_jobs(
         checker_module, limit
     );
 
-    // Fetch all targets for this module
-    let targets_query = format!(
+    // Fetch targets for this module that weren't checked in the last 5 minutes.
+    // The anti-join runs in ClickHouse so targets and recent checks come back
+    // in a single round trip. Port 0 is normalized to the default 50002 on
+    // both sides so legacy rows compare equal. The module name comes from the
+    // request, so it is bound as a query parameter rather than spliced in.
+    let jobs_query = format!(
         r#"
-        SELECT hostname as host, port
-        FROM {}.targets
-        WHERE module = '{}'
-        FORMAT JSONEachRow
-        "#,
-        worker.clickhouse.database, checker_module
-    );
-
-    let targets_response = worker
-        .http_client
-        .post(&worker.clickhouse.url)
-        .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
-        .header("Content-Type", "text/plain")
-        .body(targets_query)
-        .send()
-        .await
-        .map_err(|e| {
-            error!("ClickHouse targets query error: {}", e);
-            actix_web::error::ErrorInternalServerError("Database query failed")
-        })?;
-
-    if !targets_response.status().is_success() {
-        let err_body = targets_response.text().await.unwrap_or_default();
-        error!("ClickHouse targets query failed: {}", err_body);
-        return Err(actix_web::error::ErrorInternalServerError(
-            "Database query failed",
-        ));
-    }
-
-    let targets_body = targets_response.text().await.map_err(|e| {
-        error!("Failed to read targets response: {}", e);
-        actix_web::error::ErrorInternalServerError("Failed to read database response")
-    })?;
-
-    info!(
-        "📦 Raw targets response ({} bytes): {}",
-        targets_body.len(),
-        if targets_body.len() < 200 {
-            &targets_body
-        } else {
-            &targets_body[..200]
-        }
-    );
-
-    // Parse all targets
-    let mut all_targets = Vec::new();
-    for line in targets_body.lines() {
-        if line.trim().is_empty() {
-            continue;
-        }
-        if let Ok(mut job) = serde_json::from_str::<CheckRequest>(line) {
-            // Normalize port: if it's 0 or missing, use default 50002
-            if job.port == 0 {
-                job.port = 50002;
-            }
-            all_targets.push((job.host.clone(), job.port));
-        }
-    }
-
-    info!(
-        "📋 Found {} total targets for module={}",
-        all_targets.len(),
-        checker_module
-    );
-
-    // Fetch recently checked (hostname, port) pairs
-    let recent_checks_query = format!(
-        r#"
-        SELECT DISTINCT
+        SELECT
             hostname as host,
-            port
-        FROM {}.results
-        WHERE checker_module = '{}'
-        AND checked_at >= now() - INTERVAL 5 MINUTE
+            if(port = 0, 50002, port) as port
+        FROM {db}.targets
+        WHERE module = {{module:String}}
+        AND (hostname, if(port = 0, 50002, port)) NOT IN (
+            SELECT hostname, if(port = 0, 50002, port)
+            FROM {db}.results
+            WHERE checker_module = {{module:String}}
+            AND checked_at >= now() - INTERVAL 5 MINUTE
+        )
+        LIMIT {limit}
         FORMAT JSONEachRow
         "#,
-        worker.clickhouse.database, checker_module
+        db = worker.clickhouse.database,
+        limit = limit,
     );
 
-    let recent_response = worker
+    let jobs_response = worker
         .http_client
         .post(&worker.clickhouse.url)
+        .query(&ON_DEMAND_QUERY_SETTINGS)
+        .query(&[("param_module", checker_module)])
         .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
         .header("Content-Type", "text/plain")
-        .body(recent_checks_query)
+        .body(jobs_query)
         .send()
         .await
         .map_err(|e| {
-            error!("ClickHouse recent checks query error: {}", e);
+            error!("ClickHouse jobs query error: {}", e);
             actix_web::error::ErrorInternalServerError("Database query failed")
         })?;
 
-    if !recent_response.status().is_success() {
-        let err_body = recent_response.text().await.unwrap_or_default();
-        error!("ClickHouse recent checks query failed: {}", err_body);
+    if !jobs_response.status().is_success() {
+        let err_body = jobs_response.text().await.unwrap_or_default();
+        error!("ClickHouse jobs query failed: {}", err_body);
         return Err(actix_web::error::ErrorInternalServerError(
             "Database query failed",
         ));
     }
 
-    let recent_body = recent_response.text().await.map_err(|e| {
-        error!("Failed to read recent checks response: {}", e);
+    let jobs_body = jobs_response.text().await.map_err(|e| {
+        error!("Failed to read jobs response: {}", e);
         actix_web::error::ErrorInternalServerError("Failed to read database response")
     })?;
 
-    // Parse recently checked servers into a HashSet for fast lookup
-    let mut recently_checked = std::collections::HashSet::new();
-    for line in recent_body.lines() {
-        if line.trim().is_empty() {
-            continue;
-        }
-        if let Ok(job) = serde_json::from_str::<CheckRequest>(line) {
-            let port = if job.port == 0 { 50002 } else { job.port };
-            recently_checked.insert((job.host, port));
+    debug!(
+        "📦 Raw jobs response ({} bytes): {}",
+        jobs_body.len(),
+        if jobs_body.len() < 200 {
+            &jobs_body
+        } else {
+            &jobs_body[..200]
         }
-    }
-
-    info!(
-        "🔍 Found {} recently checked servers (last 5 min) for module={}",
-        recently_checked.len(),
-        checker_module
     );
 
-    // Filter targets to exclude recently checked ones
-    let mut jobs = Vec::new();
-    for (host, port) in all_targets {
-        if !recently_checked.contains(&(host.clone(), port)) {
-            jobs.push(CheckRequest {
-                host,
-                port,
-                check_id: None,
-                user_submitted: None,
-            });
-
-            if jobs.len() >= limit as usize {
-                break;
-            }
-        }
-    }
+    let jobs: Vec<CheckRequest> = jobs_body
+        .lines()
+        .filter(|line| !line.trim().is_empty())
+        .filter_map(|line| serde_json::from_str::<CheckRequest>(line).ok())
+        .collect();
 
     info!(
         "📤 Returning {} jobs for checker_module={}",
@@ -2656,7 +2902,24 @@ async fn get_jobs(
         .json(jobs))
 }
 
-// POST /api/v1/results - Accepts check results
+/// A row of `hosh.results` as sent in the JSONEachRow insert body. Borrows
+/// from the request so the row is serialized without building a `Value` tree.
+#[derive(Debug, Serialize)]
+struct ResultRow<'a> {
+    hostname: &'a str,
+    checker_module: &'a str,
+    status: &'a str,
+    ping_ms: Option<f64>,
+    port: u16,
+    server_version: &'a str,
+    error: &'a str,
+    block_height: u64,
+    checker_location: &'a str,
+    response_data: &'a str,
+    checked_at: &'a str,
+}
+
+// POST /api/v1/results - Accepts a check result or an array of them
 #[post("/api/v1/results")]
 async fn post_results(
     worker: web::Data<Worker>,
@@ -2672,49 +2935,27 @@ async fn post_results(
         return Err(actix_web::error::ErrorUnauthorized("Invalid API key"));
     }
 
-    info!("📥 Received check result");
-
-    // Extract fields from the result
-    let hostname = body
-        .get("hostname")
-        .or_else(|| body.get("host"))
-        .and_then(|v| v.as_str())
-        .ok_or_else(|| actix_web::error::ErrorBadRequest("Missing hostname/host field"))?;
-
-    let checker_module = body
-        .get("checker_module")
-        .and_then(|v| v.as_str())
-        .unwrap_or("unknown");
-
-    let status = body
-        .get("status")
-        .and_then(|v| v.as_str())
-        .unwrap_or("unknown");
-
-    let port = body.get("port").and_then(|v| v.as_u64()).unwrap_or(50002) as u16;
-
-    let ping_ms = body
-        .get("ping_ms")
-        .or_else(|| body.get("ping"))
-        .and_then(|v| v.as_f64());
-
-    // Extract fields we want to persist forever (before response_data TTL clears them)
-    let server_version = body
-        .get("server_version")
-        .and_then(|v| v.as_str())
-        .unwrap_or("");
-
-    let error = body.get("error").and_then(|v| v.as_str()).unwrap_or("");
+    // A checker may post a single result or an array of them; either way the
+    // rows go to ClickHouse in one insert
+    let results = match &body.0 {
+        Value::Array(results) => results.as_slice(),
+        result => std::slice::from_ref(result),
+    };
 
-    let block_height = body.get("height").and_then(|v| v.as_u64()).unwrap_or(0);
+    debug!("📥 Received {} check results", results.len());
 
-    let checker_location = body
-        .get("checker_location")
-        .and_then(|v| v.as_str())
-        .unwrap_or("");
+    if results.is_empty() {
+        return Ok(HttpResponse::Ok().json(serde_json::json!({
+            "success": true,
+            "message": "No results to store"
+        })));
+    }
 
-    // Serialize the full response data as JSON (will be TTL'd after 7 days)
-    let response_data = serde_json::to_string(&body.0).unwrap_or_default();
+    let checked_at = Utc::now().format("%Y-%m-%d %H:%M:%S%.3f").to_string();
+    let mut rows = Vec::new();
+    for result in results {
+        append_result_row(&mut rows, result, &checked_at)?;
+    }
 
     // Insert into ClickHouse with extracted columns that persist forever
     let insert_query = format!(
@@ -2722,26 +2963,12 @@ async fn post_results(
         worker.clickhouse.database
     );
 
-    let result_json = serde_json::json!({
-        "hostname": hostname,
-        "checker_module": checker_module,
-        "status": status,
-        "ping_ms": ping_ms,
-        "port": port,
-        "server_version": server_version,
-        "error": error,
-        "block_height": block_height,
-        "checker_location": checker_location,
-        "response_data": response_data,
-        "checked_at": chrono::Utc::now().format("%Y-%m-%d %H:%M:%S%.3f").to_string(),
-    });
-
     let response = worker
         .http_client
         .post(&worker.clickhouse.url)
         .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
         .header("Content-Type", "application/json")
-        .body(result_json.to_string())
+        .body(rows)
         .query(&[("query", insert_query)])
         .send()
         .await
@@ -2758,7 +2985,7 @@ async fn post_results(
         ));
     }
 
-    info!("✅ Successfully stored result for {}:{}", hostname, port);
+    info!("✅ Successfully stored {} results", results.len());
 
     Ok(HttpResponse::Ok().json(serde_json::json!({
         "success": true,
@@ -2766,16 +2993,136 @@ async fn post_results(
     })))
 }
 
-fn calculate_percentile(values: &[u64], percentile: u8) -> u64 {
+/// Append a posted check result to `rows` as one JSONEachRow line of
+/// `hosh.results`.
+fn append_result_row(rows: &mut Vec<u8>, result: &Value, checked_at: &str) -> Result<()> {
+    // Extract fields from the result
+    let hostname = result
+        .get("hostname")
+        .or_else(|| result.get("host"))
+        .and_then(|v| v.as_str())
+        .ok_or_else(|| actix_web::error::ErrorBadRequest("Missing hostname/host field"))?;
+
+    let checker_module = result
+        .get("checker_module")
+        .and_then(|v| v.as_str())
+        .unwrap_or("unknown");
+
+    let status = result
+        .get("status")
+        .and_then(|v| v.as_str())
+        .unwrap_or("unknown");
+
+    let port = result.get("port").and_then(|v| v.as_u64()).unwrap_or(50002) as u16;
+
+    let ping_ms = result
+        .get("ping_ms")
+        .or_else(|| result.get("ping"))
+        .and_then(|v| v.as_f64());
+
+    // Extract fields we want to persist forever (before response_data TTL clears them)
+    let server_version = result
+        .get("server_version")
+        .and_then(|v| v.as_str())
+        .unwrap_or("");
+
+    let error = result.get("error").and_then(|v| v.as_str()).unwrap_or("");
+
+    let block_height = result.get("height").and_then(|v| v.as_u64()).unwrap_or(0);
+
+    let checker_location = result
+        .get("checker_location")
+        .and_then(|v| v.as_str())
+        .unwrap_or("");
+
+    // Serialize the full response data as JSON (will be TTL'd after 7 days)
+    let response_data = serde_json::to_string(result).unwrap_or_default();
+
+    let row = ResultRow {
+        hostname,
+        checker_module,
+        status,
+        ping_ms,
+        port,
+        server_version,
+        error,
+        block_height,
+        checker_location,
+        response_data: &response_data,
+        checked_at,
+    };
+
+    serde_json::to_writer(&mut *rows, &row).map_err(|e| {
+        error!("Failed to serialize result row: {}", e);
+        actix_web::error::ErrorInternalServerError("Failed to insert result")
+    })?;
+    rows.push(b'\n');
+
+    debug!("Queued result for {}:{}", hostname, port);
+    Ok(())
+}
+
+/// Nearest-rank percentile of `values`. Reorders `values` in place: only the
+/// element at the percentile's index needs to end up in sorted position, so
+/// a selection is enough and neither a copy nor a full sort is needed.
+fn calculate_percentile(values: &mut [u64], percentile: u8) -> u64 {
     if values.is_empty() {
         return 0;
     }
 
-    let mut sorted = values.to_vec();
-    sorted.sort_unstable();
+    let index = (percentile as f64 / 100.0 * (values.len() - 1) as f64).round() as usize;
+    *values.select_nth_unstable(index).1
+}
+
+/// Render an age in seconds as a short relative time, e.g. "5m 3s ago".
+fn format_relative_age(total_seconds: i64) -> String {
+    if total_seconds < 0 {
+        "just now".to_string()
+    } else if total_seconds < 60 {
+        format!("{}s ago", total_seconds)
+    } else if total_seconds < 3600 {
+        let minutes = total_seconds / 60;
+        let seconds = total_seconds % 60;
+        format!("{}m {}s ago", minutes, seconds)
+    } else if total_seconds < 86400 {
+        let hours = total_seconds / 3600;
+        let mins = (total_seconds % 3600) / 60;
+        format!("{}h {}m ago", hours, mins)
+    } else {
+        let days = total_seconds / 86400;
+        let hrs = (total_seconds % 86400) / 3600;
+        format!("{}d {}h ago", days, hrs)
+    }
+}
+
+/// Borrow a string field from `ServerInfo::extra`.
+fn extra_str<'a>(extra: &'a HashMap<String, Value>, key: &str) -> Option<&'a str> {
+    extra.get(key)?.as_str()
+}
+
+/// Read a ClickHouse UInt64 column, which JSONEachRow quotes by default.
+fn json_u64(value: &Value) -> Option<u64> {
+    value
+        .as_u64()
+        .or_else(|| value.as_str().and_then(|s| s.parse().ok()))
+}
+
+/// Combine a timestamp ClickHouse already formatted with its age in seconds,
+/// e.g. "2025-01-01 12:00:00 (5m 3s ago)". Returns an empty string for NULL.
+fn format_timestamp_with_age(formatted: &Value, age_secs: &Value) -> String {
+    let Some(formatted) = formatted.as_str().filter(|s| !s.is_empty()) else {
+        return String::new();
+    };
+
+    // Int64 comes back quoted in JSONEachRow by default
+    let age = age_secs
+        .as_i64()
+        .or_else(|| age_secs.as_str().and_then(|s| s.parse().ok()));
 
-    let index = (percentile as f64 / 100.0 * (sorted.len() - 1) as f64).round() as usize;
-    sorted[index]
+    match age {
+        Some(age) => format!("{} ({})", formatted, format_relative_age(age)),
+        None => formatted.to_string(),
+    }
 }
 
 async fn calculate_uptime_stats(
@@ -2788,14 +3135,16 @@ async fn calculate_uptime_stats(
     // Query for uptime statistics using the port-aware uptime_stats_by_port materialized view
     // port_filter is for uptime_stats_by_port (port is String)
     // port_filter_results is for results table (port is UInt16)
-    let (port_filter, port_filter_results) = if let Some(port_num) = port {
+    let (port_filter, port_filter_results) = if port.is_some() {
         (
-            format!("AND port = '{}'", port_num),
-            format!("AND port = {}", port_num),
+            "AND port = toString({port:UInt16})",
+            "AND port = {port:UInt16}",
         )
     } else {
-        (String::new(), String::new())
+        ("", "")
     };
+    // Host and port are bound as ClickHouse query parameters, not spliced into SQL
+    let params = host_query_params(host, port);
 
     // Generate time reference for SQL queries
     let time_ref = time_reference_sql(at);
@@ -2815,7 +3164,7 @@ async fn calculate_uptime_stats(
         WITH first_seen_date AS (
             SELECT min(checked_at) as first_seen
             FROM {db}.results
-            WHERE hostname = '{host}'
+            WHERE hostname = {{host:String}}
             {port_filter_results}
             {results_upper_bound}
         ),
@@ -2832,7 +3181,7 @@ async fn calculate_uptime_stats(
             'day' as period,
             sum(online_count) * 100.0 / greatest(sum(total_checks), 1) as uptime_percentage
         FROM {db}.uptime_stats_by_port
-        WHERE hostname = '{host}'
+        WHERE hostname = {{host:String}}
         AND time_bucket >= {time_ref} - INTERVAL 1 DAY
         {uptime_upper_bound}
         {port_filter}
@@ -2843,7 +3192,7 @@ async fn calculate_uptime_stats(
             'week' as period,
             sum(online_count) * 100.0 / greatest(sum(total_checks), 1) as uptime_percentage
         FROM {db}.uptime_stats_by_port
-        WHERE hostname = '{host}'
+        WHERE hostname = {{host:String}}
         AND time_bucket >= {time_ref} - INTERVAL 7 DAY
         {uptime_upper_bound}
         {port_filter}
@@ -2856,7 +3205,7 @@ async fn calculate_uptime_stats(
             'month' as period,
             (sum(online_count) * 100.0 / greatest(sum(total_checks), 1)) * (SELECT percentage_of_month FROM hours_announced) as uptime_percentage
         FROM {db}.uptime_stats_by_port
-        WHERE hostname = '{host}'
+        WHERE hostname = {{host:String}}
         AND time_bucket >= {time_ref} - INTERVAL 30 DAY
         {uptime_upper_bound}
         {port_filter}
@@ -2868,7 +3217,7 @@ async fn calculate_uptime_stats(
             sum(u.online_count) * 100.0 / greatest(sum(u.total_checks), 1) as uptime_percentage
         FROM {db}.uptime_stats_by_port u
         CROSS JOIN first_seen_date fs
-        WHERE u.hostname = '{host}'
+        WHERE u.hostname = {{host:String}}
         AND u.time_bucket >= fs.first_seen
         {uptime_upper_bound}
         {port_filter}
@@ -2877,7 +3226,6 @@ async fn calculate_uptime_stats(
         FORMAT JSONEachRow
         "#,
         db = worker.clickhouse.database,
-        host = host,
         port_filter_results = port_filter_results,
         results_upper_bound = results_upper_bound,
         time_ref = time_ref,
@@ -2885,67 +3233,11 @@ async fn calculate_uptime_stats(
         port_filter = port_filter,
     );
 
-    let response = worker
-        .http_client
-        .post(&worker.clickhouse.url)
-        .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
-        .header("Content-Type", "text/plain")
-        .body(uptime_query)
-        .send()
-        .await
-        .map_err(|e| {
-            error!("ClickHouse uptime query error: {}", e);
-            actix_web::error::ErrorInternalServerError("Database query failed")
-        })?;
-
-    let status = response.status();
-    let body = response.text().await.map_err(|e| {
-        error!("Failed to read uptime response body: {}", e);
-        actix_web::error::ErrorInternalServerError("Failed to read database response")
-    })?;
-
-    if !status.is_success() {
-        error!(
-            "ClickHouse uptime query failed with status {}: {}",
-            status, body
-        );
-        return Err(actix_web::error::ErrorInternalServerError(
-            "Database query failed",
-        ));
-    }
-
-    // Parse the uptime statistics
-    let mut last_day = 0.0;
-    let mut last_week = 0.0;
-    let mut last_month = 0.0;
-    let mut uptime_since_launch = 0.0;
-
-    for line in body.lines() {
-        if line.trim().is_empty() {
-            continue;
-        }
-
-        if let Ok(result) = serde_json::from_str::<serde_json::Value>(line) {
-            if let (Some(period), Some(uptime)) = (
-                result["period"].as_str(),
-                result["uptime_percentage"].as_f64(),
-            ) {
-                match period {
-                    "day" => last_day = uptime,
-                    "week" => last_week = uptime,
-                    "month" => last_month = uptime,
-                    "since_launch" => uptime_since_launch = uptime,
-                    _ => {}
-                }
-            }
-        }
-    }
-
     // Get total checks, last check time, last online time, first_seen, and current status
-    let port_filter_stats = if let Some(port_num) = port {
-        format!("AND port = {}", port_num)
+    let port_filter_stats = if port.is_some() {
+        "AND port = {port:UInt16}"
     } else {
-        String::new()
+        ""
     };
 
     let stats_query = format!(
@@ -2953,7 +3245,7 @@ async fn calculate_uptime_stats(
         WITH latest_check AS (
             SELECT status, checked_at
             FROM {db}.results
-            WHERE hostname = '{host}'
+            WHERE hostname = {{host:String}}
             {port_filter_stats}
             {results_upper_bound}
             ORDER BY checked_at DESC
@@ -2962,7 +3254,7 @@ async fn calculate_uptime_stats(
         first_seen_ever AS (
             SELECT min(checked_at) as first_seen
             FROM {db}.results
-            WHERE hostname = '{host}'
+            WHERE hostname = {{host:String}}
             {port_filter_stats}
             {results_upper_bound}
         )
@@ -2970,77 +3262,118 @@ async fn calculate_uptime_stats(
             count(*) as total_checks,
             countIf(status = 'online') as checks_succeeded,
             countIf(status != 'online') as checks_failed,
-            max(checked_at) as last_check,
-            max(CASE WHEN status = 'online' THEN checked_at END) as last_online,
-            (SELECT first_seen FROM first_seen_ever) as first_seen,
-            (SELECT status FROM latest_check) as current_status
+            max(checked_at) as last_check_at,
+            max(CASE WHEN status = 'online' THEN checked_at END) as last_online_at,
+            (SELECT first_seen FROM first_seen_ever) as first_seen_at,
+            -- Format timestamps and compute their age here rather than
+            -- re-parsing ClickHouse's DateTime64 text output in Rust
+            formatDateTime(last_check_at, '%Y-%m-%d %H:%M:%S', 'UTC') as last_check,
+            dateDiff('second', last_check_at, now()) as last_check_age,
+            formatDateTime(last_online_at, '%Y-%m-%d %H:%M:%S', 'UTC') as last_online,
+            dateDiff('second', last_online_at, now()) as last_online_age,
+            formatDateTime(first_seen_at, '%Y-%m-%d %H:%M:%S', 'UTC') as first_seen,
+            dateDiff('second', first_seen_at, now()) as first_seen_age,
+            (SELECT status FROM latest_check) = 'online' as is_online
         FROM {db}.results
-        WHERE hostname = '{host}'
+        WHERE hostname = {{host:String}}
         AND checked_at >= {time_ref} - INTERVAL 30 DAY
         {results_upper_bound}
         {port_filter_stats}
         FORMAT JSONEachRow
         "#,
         db = worker.clickhouse.database,
-        host = host,
         port_filter_stats = port_filter_stats,
         results_upper_bound = results_upper_bound,
         time_ref = time_ref,
     );
 
-    // info!("🔍 Stats query for host {}: {}", host, stats_query.replace("\n", " "));
+    // The uptime and stats queries are independent, so send them together
+    // instead of waiting on one ClickHouse round trip before starting the next
+    let (body, stats_body) = tokio::try_join!(
+        async {
+            let response = worker
+                .http_client
+                .post(&worker.clickhouse.url)
+                .query(&ON_DEMAND_QUERY_SETTINGS)
+                .query(&params)
+                .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
+                .header("Content-Type", "text/plain")
+                .body(uptime_query)
+                .send()
+                .await
+                .map_err(|e| {
+                    error!("ClickHouse uptime query error: {}", e);
+                    actix_web::error::ErrorInternalServerError("Database query failed")
+                })?;
+
+            let status = response.status();
+            let body = response.text().await.map_err(|e| {
+                error!("Failed to read uptime response body: {}", e);
+                actix_web::error::ErrorInternalServerError("Failed to read database response")
+            })?;
 
-    // Also run a debug query to see what data exists for this host
-    let debug_query = format!(
-        r#"
-        SELECT
-            hostname,
-            checker_module,
-            count(*) as check_count,
-            max(checked_at) as last_check
-        FROM {}.results
-        WHERE hostname = '{}'
-        GROUP BY hostname, checker_module
-        ORDER BY check_count DESC
-        FORMAT JSONEachRow
-        "#,
-        worker.clickhouse.database, host
-    );
+            if !status.is_success() {
+                error!(
+                    "ClickHouse uptime query failed with status {}: {}",
+                    status, body
+                );
+                return Err(actix_web::error::ErrorInternalServerError(
+                    "Database query failed",
+                ));
+            }
+            Ok::<_, actix_web::Error>(body)
+        },
+        async {
+            let stats_response = worker
+                .http_client
+                .post(&worker.clickhouse.url)
+                .query(&ON_DEMAND_QUERY_SETTINGS)
+                .query(&params)
+                .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
+                .header("Content-Type", "text/plain")
+                .body(stats_query)
+                .send()
+                .await
+                .map_err(|e| {
+                    error!("ClickHouse stats query error: {}", e);
+                    actix_web::error::ErrorInternalServerError("Database query failed")
+                })?;
+
+            let stats_body = stats_response.text().await.map_err(|e| {
+                error!("Failed to read stats response body: {}", e);
+                actix_web::error::ErrorInternalServerError("Failed to read database response")
+            })?;
+            Ok::<_, actix_web::Error>(stats_body)
+        },
+    )?;
 
-    let debug_response = worker
-        .http_client
-        .post(&worker.clickhouse.url)
-        .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
-        .header("Content-Type", "text/plain")
-        .body(debug_query)
-        .send()
-        .await;
+    // Parse the uptime statistics
+    let mut last_day = 0.0;
+    let mut last_week = 0.0;
+    let mut last_month = 0.0;
+    let mut uptime_since_launch = 0.0;
+
+    for line in body.lines() {
+        if line.trim().is_empty() {
+            continue;
+        }
 
-    if let Ok(debug_resp) = debug_response {
-        if let Ok(_debug_body) = debug_resp.text().await {
-            // Debug response logged but not used
+        if let Ok(result) = serde_json::from_str::<serde_json::Value>(line) {
+            if let (Some(period), Some(uptime)) = (
+                result["period"].as_str(),
+                result["uptime_percentage"].as_f64(),
+            ) {
+                match period {
+                    "day" => last_day = uptime,
+                    "week" => last_week = uptime,
+                    "month" => last_month = uptime,
+                    "since_launch" => uptime_since_launch = uptime,
+                    _ => {}
+                }
+            }
         }
     }
 
-    let stats_response = worker
-        .http_client
-        .post(&worker.clickhouse.url)
-        .basic_auth(&worker.clickhouse.user, Some(&worker.clickhouse.password))
-        .header("Content-Type", "text/plain")
-        .body(stats_query)
-        .send()
-        .await
-        .map_err(|e| {
-            error!("ClickHouse stats query error: {}", e);
-            actix_web::error::ErrorInternalServerError("Database query failed")
-        })?;
-
-    let _status = stats_response.status();
-    let stats_body = stats_response.text().await.map_err(|e| {
-        error!("Failed to read stats response body: {}", e);
-        actix_web::error::ErrorInternalServerError("Failed to read database response")
-    })?;
-
     let mut total_checks = 0u64;
     let mut checks_succeeded = 0u64;
     let mut checks_failed = 0u64;
@@ -3055,142 +3388,42 @@ async fn calculate_uptime_stats(
         }
 
         if let Ok(result) = serde_json::from_str::<serde_json::Value>(line) {
-            // Handle total_checks - it might be a string or number
-            if let Some(checks) = result["total_checks"].as_u64() {
+            // Counts are UInt64, so they may arrive as strings or numbers
+            if let Some(checks) = json_u64(&result["total_checks"]) {
                 total_checks = checks;
-            } else if let Some(checks_str) = result["total_checks"].as_str() {
-                if let Ok(checks) = checks_str.parse::<u64>() {
-                    total_checks = checks;
-                }
             }
-
-            // Handle checks_succeeded
-            if let Some(succeeded) = result["checks_succeeded"].as_u64() {
+            if let Some(succeeded) = json_u64(&result["checks_succeeded"]) {
                 checks_succeeded = succeeded;
-            } else if let Some(succeeded_str) = result["checks_succeeded"].as_str() {
-                if let Ok(succeeded) = succeeded_str.parse::<u64>() {
-                    checks_succeeded = succeeded;
-                }
             }
-
-            // Handle checks_failed
-            if let Some(failed) = result["checks_failed"].as_u64() {
+            if let Some(failed) = json_u64(&result["checks_failed"]) {
                 checks_failed = failed;
-            } else if let Some(failed_str) = result["checks_failed"].as_str() {
-                if let Ok(failed) = failed_str.parse::<u64>() {
-                    checks_failed = failed;
-                }
-            }
-
-            if let Some(check_time) = result["last_check"].as_str() {
-                last_check = check_time.to_string();
             }
 
-            // Handle last_online - could be a string or NULL
-            if let Some(online_time) = result["last_online"].as_str() {
-                last_online = online_time.to_string();
-            } else {
-                // If last_online is NULL or missing, set to empty string
-                last_online = String::new();
-            }
-
-            // Handle first_seen
-            if let Some(seen_time) = result["first_seen"].as_str() {
-                first_seen = seen_time.to_string();
-            }
-
-            if let Some(current_status) = result["current_status"].as_str() {
-                is_currently_online = current_status == "online";
-            }
-
-            // Debug logging for this specific server
-            if host == "lightwalletd.stakehold.rs" {
-                info!("🔍 Debug for {}: current_status={:?}, is_currently_online={}, last_online='{}'",
-                      host, result["current_status"], is_currently_online, last_online);
-            }
+            // Timestamps arrive pre-formatted with their age in seconds;
+            // last_online is NULL if the server has never been seen online
+            last_check =
+                format_timestamp_with_age(&result["last_check"], &result["last_check_age"]);
+            last_online =
+                format_timestamp_with_age(&result["last_online"], &result["last_online_age"]);
+            first_seen =
+                format_timestamp_with_age(&result["first_seen"], &result["first_seen_age"]);
+
+            is_currently_online = result["is_online"].as_u64() == Some(1)
+                || result["is_online"].as_bool() == Some(true);
         }
     }
 
-    // Format timestamps for better display (remove milliseconds and add relative time)
-    let format_timestamp = |timestamp: &str| -> (String, String) {
-        if timestamp.is_empty() {
-            return (String::new(), String::new());
-        }
-
-        // Parse the timestamp
-        let parsed_time = DateTime::parse_from_rfc3339(timestamp)
-            .ok()
-            .or_else(|| parse_rfc3339_with_nanos(timestamp));
-
-        if let Some(time) = parsed_time {
-            // Format without milliseconds
-            let formatted = time.format("%Y-%m-%d %H:%M:%S").to_string();
-
-            // Calculate relative time
-            let now = Utc::now().with_timezone(time.offset());
-            let duration = now.signed_duration_since(time);
-            let total_seconds = duration.num_seconds();
-
-            let relative = if total_seconds < 0 {
-                "just now".to_string()
-            } else if total_seconds < 60 {
-                format!("{}s ago", total_seconds)
-            } else if total_seconds < 3600 {
-                let minutes = total_seconds / 60;
-                let seconds = total_seconds % 60;
-                format!("{}m {}s ago", minutes, seconds)
-            } else if total_seconds < 86400 {
-                let hours = total_seconds / 3600;
-                let mins = (total_seconds % 3600) / 60;
-                format!("{}h {}m ago", hours, mins)
-            } else {
-                let days = total_seconds / 86400;
-                let hrs = (total_seconds % 86400) / 3600;
-                format!("{}d {}h ago", days, hrs)
-            };
-
-            (formatted, relative)
-        } else {
-            (timestamp.to_string(), String::new())
-        }
-    };
-
-    let (last_check_formatted, last_check_relative) = format_timestamp(&last_check);
-    let (last_online_formatted, last_online_relative) = format_timestamp(&last_online);
-    let (first_seen_formatted, first_seen_relative) = format_timestamp(&first_seen);
-
-    // Combine formatted timestamp with relative time
-    let last_check_display = if !last_check_relative.is_empty() {
-        format!("{} ({})", last_check_formatted, last_check_relative)
-    } else {
-        last_check_formatted
-    };
-
-    let last_online_display = if !last_online_relative.is_empty() {
-        format!("{} ({})", last_online_formatted, last_online_relative)
-    } else {
-        last_online_formatted
-    };
-
-    let first_seen_display = if !first_seen_relative.is_empty() {
-        format!("{} ({})", first_seen_formatted, first_seen_relative)
-    } else if !first_seen.is_empty() {
-        first_seen_formatted
-    } else {
-        String::new()
-    };
-
     Ok(UptimeStats {
         last_day,
         last_week,
         last_month,
         uptime_since_launch,
-        first_seen: first_seen_display,
+        first_seen,
         total_checks,
         checks_succeeded,
         checks_failed,
-        last_check: last_check_display,
-        last_online: last_online_display,
+        last_check,
+        last_online,
         is_currently_online,
         last_day_formatted: format!("{:.5}%", last_day),
         last_week_formatted: format!("{:.5}%", last_week),
@@ -3215,37 +3448,224 @@ mod tests {
     }
 
     #[test]
-    fn test_filter_api_json_by_chain() {
-        let json = r#"{"servers":[
-            {"hostname":"a.example.com","chain":"main"},
-            {"hostname":"b.example.com","chain":"test"},
-            {"hostname":"c.example.com"}
-        ]}"#;
+    fn test_api_json_for_chain() {
+        let server = |hostname: &str, chain: Option<&str>| ApiServerInfo {
+            hostname: hostname.to_string(),
+            port: 443,
+            protocol: "grpc",
+            ping: None,
+            online: true,
+            community: false,
+            height: 0,
+            chain: chain.map(|c| c.to_string()),
+            uptime_30d: None,
+            first_seen: None,
+            lightwallet_server_version: None,
+            node_version: None,
+            consensus_branch_id: None,
+            donation_address: None,
+        };
+        let servers = vec![
+            server("a.example.com", Some("main")),
+            server("b.example.com", Some("test")),
+            server("c.example.com", None),
+        ];
+        let hosts = |json: String| -> Vec<String> {
+            let value: serde_json::Value = serde_json::from_str(&json).unwrap();
+            value["servers"]
+                .as_array()
+                .unwrap()
+                .iter()
+                .map(|s| s["hostname"].as_str().unwrap().to_string())
+                .collect()
+        };
+
+        // No filter keeps everything
+        assert_eq!(
+            hosts(api_json_for_chain(&servers, None).unwrap()),
+            vec!["a.example.com", "b.example.com", "c.example.com"]
+        );
 
         // Mainnet filter keeps explicit "main" and servers without a chain key
-        let filtered = filter_api_json_by_chain(json, "main").unwrap();
-        let value: serde_json::Value = serde_json::from_str(&filtered).unwrap();
-        let hosts: Vec<&str> = value["servers"]
-            .as_array()
-            .unwrap()
-            .iter()
-            .map(|s| s["hostname"].as_str().unwrap())
-            .collect();
-        assert_eq!(hosts, vec!["a.example.com", "c.example.com"]);
+        assert_eq!(
+            hosts(api_json_for_chain(&servers, Some("main")).unwrap()),
+            vec!["a.example.com", "c.example.com"]
+        );
 
         // Testnet filter keeps only explicit "test"
-        let filtered = filter_api_json_by_chain(json, "test").unwrap();
-        let value: serde_json::Value = serde_json::from_str(&filtered).unwrap();
-        let hosts: Vec<&str> = value["servers"]
-            .as_array()
+        assert_eq!(
+            hosts(api_json_for_chain(&servers, Some("test")).unwrap()),
+            vec!["b.example.com"]
+        );
+    }
+
+    #[test]
+    fn test_if_none_match_contains() {
+        let entry = CacheEntry::new("<html></html>".to_string());
+        assert!(if_none_match_contains(&entry.etag, &entry.etag));
+        assert!(if_none_match_contains(
+            &format!("\"other\", W/{}", entry.etag),
+            &entry.etag
+        ));
+        assert!(if_none_match_contains("*", &entry.etag));
+        assert!(!if_none_match_contains("\"other\"", &entry.etag));
+
+        // Same content always yields the same ETag
+        assert_eq!(
+            entry.etag,
+            CacheEntry::new("<html></html>".to_string()).etag
+        );
+    }
+
+    #[test]
+    fn test_api_cache_key() {
+        assert_eq!(api_cache_key("zec", None), "zec-api");
+        assert_eq!(api_cache_key("zec", Some("main")), "zec-api-main");
+        assert_eq!(api_cache_key("btc", Some("test")), "btc-api-test");
+    }
+
+    #[test]
+    fn test_format_timestamp_with_age() {
+        use serde_json::json;
+
+        assert_eq!(
+            format_timestamp_with_age(&json!("2025-01-01 12:00:00"), &json!("303")),
+            "2025-01-01 12:00:00 (5m 3s ago)"
+        );
+        assert_eq!(
+            format_timestamp_with_age(&json!("2025-01-01 12:00:00"), &json!(90000)),
+            "2025-01-01 12:00:00 (1d 1h ago)"
+        );
+        assert_eq!(format_timestamp_with_age(&json!(null), &json!(null)), "");
+        assert_eq!(format_relative_age(-5), "just now");
+        assert_eq!(format_relative_age(3660), "1h 1m ago");
+    }
+
+    #[test]
+    fn test_page_variants() {
+        let variants = page_variants();
+        assert_eq!(variants.len(), 16);
+        assert_eq!(variants[0].cache_key, "zec-false-false-false");
+        assert_eq!(
+            variants.last().map(|v| v.cache_key.as_str()),
+            Some("btc-true-true-true")
+        );
+        assert!(variants.iter().all(|v| v.cache_key
+            == page_cache_key(v.network.0, v.hide_community, v.tor_only, v.show_outdated)));
+    }
+
+    #[test]
+    fn test_network_spec() {
+        let zec = SafeNetwork::from_str("zec").unwrap();
+        assert_eq!(zec.spec().default_port, 443);
+        assert_eq!(zec.spec().api_protocol, "grpc");
+
+        let btc = SafeNetwork::from_str("btc").unwrap();
+        assert_eq!(btc.spec().default_port, 50002);
+        assert_eq!(btc.spec().api_protocol, "ssl");
+
+        assert!(SafeNetwork::from_str("eth").is_none());
+    }
+
+    #[test]
+    fn test_extra_str() {
+        let mut extra = HashMap::new();
+        extra.insert("chain_name".to_string(), Value::String("main".to_string()));
+        extra.insert("height".to_string(), Value::from(100));
+
+        assert_eq!(extra_str(&extra, "chain_name"), Some("main"));
+        assert_eq!(extra_str(&extra, "height"), None);
+        assert_eq!(extra_str(&extra, "missing"), None);
+    }
+
+    #[test]
+    fn test_direct_view_cache_key() {
+        let at = DateTime::parse_from_rfc3339("2025-01-15T14:30:00Z")
             .unwrap()
-            .iter()
-            .map(|s| s["hostname"].as_str().unwrap())
-            .collect();
-        assert_eq!(hosts, vec!["b.example.com"]);
+            .with_timezone(&Utc);
+
+        assert_eq!(
+            direct_view_cache_key("zec", false, true, false, None, Some(at)),
+            "direct-zec-false-true-false--1736951400000"
+        );
+        assert_eq!(
+            direct_view_cache_key("btc", false, false, false, Some("zecrocks"), None),
+            "direct-btc-false-false-false-zecrocks-0"
+        );
+        assert!(
+            direct_view_cache_key("zec", false, false, false, None, Some(at))
+                .starts_with(DIRECT_VIEW_CACHE_PREFIX)
+        );
+    }
+
+    #[test]
+    fn test_direct_api_cache_key() {
+        let at = DateTime::parse_from_rfc3339("2025-01-15T14:30:00Z")
+            .unwrap()
+            .with_timezone(&Utc);
+
+        assert_eq!(
+            direct_api_cache_key("zec", None, at),
+            "direct-zec-api-1736951400000"
+        );
+        assert_eq!(
+            direct_api_cache_key("zec", Some("test"), at),
+            "direct-zec-api-test-1736951400000"
+        );
+    }
+
+    #[test]
+    fn test_time_reference_sql() {
+        assert_eq!(time_reference_sql(None), "now()");
+        assert!(matches!(time_reference_sql(None), Cow::Borrowed(_)));
+
+        let at = DateTime::parse_from_rfc3339("2025-01-15T14:30:00Z")
+            .unwrap()
+            .with_timezone(&Utc);
+        assert_eq!(
+            time_reference_sql(Some(at)),
+            "parseDateTimeBestEffort('2025-01-15T14:30:00+00:00')"
+        );
+    }
+
+    #[test]
+    fn test_json_u64() {
+        use serde_json::json;
+
+        assert_eq!(json_u64(&json!(42)), Some(42));
+        assert_eq!(json_u64(&json!("42")), Some(42));
+        assert_eq!(json_u64(&json!("")), None);
+        assert_eq!(json_u64(&json!(-1)), None);
+        assert_eq!(json_u64(&Value::Null), None);
+    }
+
+    #[test]
+    fn test_host_query_params() {
+        assert_eq!(
+            host_query_params("zec.rocks", None),
+            vec![("param_host", "zec.rocks".to_string())]
+        );
+        assert_eq!(
+            host_query_params("zec.rocks", Some(443)),
+            vec![
+                ("param_host", "zec.rocks".to_string()),
+                ("param_port", "443".to_string())
+            ]
+        );
+    }
 
-        // Invalid JSON is an error, not a panic
-        assert!(filter_api_json_by_chain("not json", "main").is_err());
+    #[test]
+    fn test_server_detail_cache_key() {
+        assert_eq!(
+            server_detail_cache_key("zec", "zec.rocks", Some(443)),
+            "detail-zec-zec.rocks:443"
+        );
+        assert_eq!(
+            server_detail_cache_key("btc", "electrum.example.com", None),
+            "detail-btc-electrum.example.com"
+        );
+        assert!(server_detail_cache_key("zec", "zec.rocks", None)
+            .starts_with(SERVER_DETAIL_CACHE_PREFIX));
     }
 
     #[test]
@@ -3277,6 +3697,15 @@ mod tests {
         assert_eq!(result, "Connection refused - server may be offline");
     }
 
+    #[test]
+    fn test_is_valid_json() {
+        assert!(is_valid_json(r#"{"height": 2500000, "vendor": null}"#));
+        assert!(is_valid_json(r#"  [1, {"a": "b"}]  "#));
+        assert!(!is_valid_json(r#"{"height": 2500000,}"#));
+        assert!(!is_valid_json(r#"{"a": 1}{"b": 2}"#));
+        assert!(!is_valid_json(""));
+    }
+
     #[test]
     fn test_validate_and_fix_json() {
         // Test valid JSON
@@ -3498,6 +3927,104 @@ mod tests {
         assert_eq!(server_info.user_submitted, false);
     }
 
+    #[test]
+    fn test_status_row() {
+        let line = r#"{"hostname":"zec.rocks","checked_at":"2025-07-31 21:11:21.472","status":"online","ping":12.5,"response_data":"{\"height\":2500000}","uptime_30_day":99.5,"community":true}"#;
+        let row: StatusRow = serde_json::from_str(line).unwrap();
+        assert_eq!(row.hostname.as_deref(), Some("zec.rocks"));
+        assert_eq!(row.checked_at.as_deref(), Some("2025-07-31 21:11:21.472"));
+        assert_eq!(row.ping, Some(12.5));
+        assert_eq!(row.response_data.as_deref(), Some(r#"{"height":2500000}"#));
+        assert_eq!(row.uptime_30_day, Some(99.5));
+        assert_eq!(row.community, Some(true));
+        assert_eq!(row.first_seen, None);
+
+        let row: StatusRow = serde_json::from_str(r#"{"hostname":"zec.rocks"}"#).unwrap();
+        assert!(row.response_data.is_none());
+        assert_eq!(row.community, None);
+    }
+
+    #[test]
+    fn test_drain_complete_lines() {
+        let mut lines = Vec::new();
+        let mut buffer = b"{\"a\":1}\n{\"b\"".to_vec();
+        drain_complete_lines(&mut buffer, |line| lines.push(line.to_vec()));
+        assert_eq!(lines, vec![b"{\"a\":1}".to_vec()]);
+        assert_eq!(buffer, b"{\"b\"");
+
+        buffer.extend_from_slice(b":2}\n\n");
+        drain_complete_lines(&mut buffer, |line| lines.push(line.to_vec()));
+        assert_eq!(lines.len(), 3);
+        assert_eq!(lines[1], b"{\"b\":2}");
+        assert!(lines[2].is_empty());
+        assert!(buffer.is_empty());
+    }
+
+    #[test]
+    fn test_calculate_percentile() {
+        assert_eq!(calculate_percentile(&mut [], 90), 0);
+        assert_eq!(calculate_percentile(&mut [7], 90), 7);
+
+        let mut heights: Vec<u64> = (1..=20).rev().collect();
+        assert_eq!(calculate_percentile(&mut heights, 90), 18);
+        assert_eq!(calculate_percentile(&mut heights, 50), 11);
+        assert_eq!(calculate_percentile(&mut heights, 100), 20);
+    }
+
+    #[test]
+    fn test_result_row() {
+        use serde_json::json;
+
+        let row = ResultRow {
+            hostname: "zec.rocks",
+            checker_module: "zec",
+            status: "online",
+            ping_ms: None,
+            port: 443,
+            server_version: "",
+            error: "",
+            block_height: 2500000,
+            checker_location: "dfw",
+            response_data: r#"{"height":2500000}"#,
+            checked_at: "2025-07-31 21:11:21.472",
+        };
+        let value: Value = serde_json::from_str(&serde_json::to_string(&row).unwrap()).unwrap();
+        assert_eq!(value["hostname"], json!("zec.rocks"));
+        assert_eq!(value["ping_ms"], Value::Null);
+        assert_eq!(value["port"], json!(443));
+        assert_eq!(value["block_height"], json!(2500000));
+        assert_eq!(value["response_data"], json!(r#"{"height":2500000}"#));
+        assert_eq!(value["checked_at"], json!("2025-07-31 21:11:21.472"));
+    }
+
+    #[test]
+    fn test_append_result_row() {
+        use serde_json::json;
+
+        let mut rows = Vec::new();
+        let results = [
+            json!({"host": "zec.rocks", "port": 443, "height": 2500000, "ping": 12.5}),
+            json!({"hostname": "electrum.blockstream.info", "status": "online"}),
+        ];
+        for result in &results {
+            append_result_row(&mut rows, result, "2025-07-31 21:11:21.472").unwrap();
+        }
+
+        let lines: Vec<Value> = std::str::from_utf8(&rows)
+            .unwrap()
+            .lines()
+            .map(|line| serde_json::from_str(line).unwrap())
+            .collect();
+        assert_eq!(lines.len(), 2);
+        assert_eq!(lines[0]["hostname"], json!("zec.rocks"));
+        assert_eq!(lines[0]["ping_ms"], json!(12.5));
+        assert_eq!(lines[0]["block_height"], json!(2500000));
+        assert_eq!(lines[1]["port"], json!(50002));
+        assert_eq!(lines[1]["status"], json!("online"));
+
+        assert!(append_result_row(&mut rows, &json!({"port": 443}), "").is_err());
+    }
+
     #[test]
     fn test_timestamp_parsing() {
         // Test RFC3339 timestamp parsing
@@ -3517,6 +4044,7 @@ mod tests {
             extra: HashMap::new(),
             last_updated: Some("2025-07-31T21:11:21.472525544Z".to_string()),
             uptime_30_day: None,
+            placeholder: false,
         };
 
         let formatted = server_info.formatted_last_updated();
@@ -3542,6 +4070,7 @@ mod tests {
             extra: HashMap::new(),
             last_updated: Some("2025-07-31T21:11:21.472525544Z".to_string()),
             uptime_30_day: None,
+            placeholder: false,
         };
 
         let formatted2 = server_info2.formatted_last_updated();
@@ -3570,6 +4099,16 @@ mod tests {
         let timestamp3 = "2025-07-31T21:11:21Z";
         let parsed3 = parse_rfc3339_with_nanos(timestamp3);
         assert!(parsed3.is_some());
+
+        // Test ClickHouse's checked_at format, which has no offset
+        let timestamp4 = "2025-07-31 21:11:21.472";
+        let parsed4 = parse_rfc3339_with_nanos(timestamp4);
+        assert_eq!(
+            parsed4,
+            parse_rfc3339_with_nanos("2025-07-31T21:11:21.472Z")
+        );
+        assert!(parsed4.is_some());
+        assert!(parse_rfc3339_with_nanos("not a timestamp").is_none());
     }
 
     #[test]
@@ -3604,209 +4143,205 @@ mod tests {
     }
 }
 
-/// Background task to refresh the cache periodically
-async fn cache_refresh_task(worker: Worker) {
-    // Increase interval to reduce load - env var or default to 20 seconds
-    let refresh_interval_secs = env::var("CACHE_REFRESH_INTERVAL_SECS")
-        .ok()
-        .and_then(|s| s.parse::<u64>().ok())
-        .unwrap_or(20);
+/// Cache key for a pre-rendered network status page.
+fn page_cache_key(
+    network: &str,
+    hide_community: bool,
+    tor_only: bool,
+    show_outdated: bool,
+) -> String {
+    format!(
+        "{}-{}-{}-{}",
+        network, hide_community, tor_only, show_outdated
+    )
+}
 
-    // Refresh cache for each network, hide_community, and tor_only combination
-    let networks = vec!["zec", "btc"];
-    let hide_community_options = vec![false, true];
-    let tor_only_options = vec![false, true];
-    let show_outdated_options = vec![false, true];
-
-    // Populate cache immediately on startup (before starting the interval loop)
-    info!("Initial cache population on startup");
-    let cycle_start = std::time::Instant::now();
-
-    for network_str in &networks {
-        for &hide_community in &hide_community_options {
-            for &tor_only in &tor_only_options {
-                for &show_outdated in &show_outdated_options {
-                    let cache_key = format!(
-                        "{}-{}-{}-{}",
-                        network_str, hide_community, tor_only, show_outdated
-                    );
-
-                    if let Some(network) = SafeNetwork::from_str(network_str) {
-                        let query_start = std::time::Instant::now();
-
-                        let result = fetch_and_render_network_status(
-                            &worker,
-                            &network,
+/// One pre-rendered combination of network and index page filters.
+struct PageVariant {
+    network: SafeNetwork,
+    hide_community: bool,
+    tor_only: bool,
+    show_outdated: bool,
+    cache_key: String,
+}
+
+/// Every network/filter combination the refresh task keeps warm. Built once
+/// so each cycle doesn't re-derive the same keys.
+fn page_variants() -> Vec<PageVariant> {
+    let mut variants = Vec::new();
+    for spec in &NETWORKS {
+        let network = SafeNetwork(spec.name);
+        for hide_community in [false, true] {
+            for tor_only in [false, true] {
+                for show_outdated in [false, true] {
+                    variants.push(PageVariant {
+                        network: SafeNetwork(network.0),
+                        hide_community,
+                        tor_only,
+                        show_outdated,
+                        cache_key: page_cache_key(
+                            network.0,
                             hide_community,
                             tor_only,
                             show_outdated,
-                            None, // No operator filter for cache refresh
-                            None, // No historical timestamp for cache refresh
-                        )
-                        .await;
-                        match result {
-                            Ok(html) => {
-                                let mut cache = worker.cache.write().await;
-                                cache.insert(
-                                    cache_key.clone(),
-                                    CacheEntry {
-                                        html,
-                                        timestamp: std::time::Instant::now(),
-                                    },
-                                );
-                                info!(
-                                    "Cache refreshed for {} in {:?}",
-                                    cache_key,
-                                    query_start.elapsed()
-                                );
-                            }
-                            Err(e) => {
-                                error!("Failed to refresh cache for {}: {}", cache_key, e);
-                            }
-                        }
-
-                        // Add a small delay between queries to prevent memory spikes
-                        tokio::time::sleep(Duration::from_millis(500)).await;
-                    } else {
-                        error!("Invalid network: {}", network_str);
-                    }
+                        ),
+                    });
                 }
             }
         }
     }
+    variants
+}
 
-    // Populate API JSON cache for each network
-    for network_str in &networks {
-        if let Some(network) = SafeNetwork::from_str(network_str) {
-            let cache_key = format!("{}-api", network_str);
-            let query_start = std::time::Instant::now();
-
-            match fetch_api_json(&worker, &network, None).await {
-                Ok(json) => {
-                    let mut cache = worker.cache.write().await;
-                    cache.insert(
-                        cache_key.clone(),
-                        CacheEntry {
-                            html: json,
-                            timestamp: std::time::Instant::now(),
-                        },
-                    );
-                    info!(
-                        "Cache refreshed for {} in {:?}",
-                        cache_key,
-                        query_start.elapsed()
-                    );
-                }
-                Err(e) => {
-                    error!("Failed to refresh cache for {}: {}", cache_key, e);
-                }
+/// Re-render every cached page variant and API response for one network from
+/// a single ClickHouse query. If the query or a render fails, the old cache
+/// entry is kept.
+async fn refresh_network_pages(worker: &Worker, network: &SafeNetwork, variants: &[PageVariant]) {
+    let query_start = std::time::Instant::now();
+
+    let servers = match fetch_network_servers(worker, network, None).await {
+        Ok(servers) => servers,
+        Err(e) => {
+            error!("Failed to refresh cache for {}: {}", network.0, e);
+            return;
+        }
+    };
+
+    // The API reports the same rows, so build its cached responses from this
+    // fetch instead of running a second, near-identical query.
+    let api_servers: Vec<ApiServerInfo> = servers
+        .iter()
+        .filter(|server| !server.placeholder)
+        .map(|server| to_api_server(server, network))
+        .collect();
+    cache_api_json(worker, network.0, &api_servers).await;
+
+    // Rendering and hashing the pages is CPU-bound. Run it on tokio's shared
+    // blocking pool so the actix worker this task lives on keeps serving
+    // requests in the meantime.
+    let network_name = network.0;
+    let variants: Vec<(String, bool, bool, bool)> = variants
+        .iter()
+        .filter(|v| v.network.0 == network_name)
+        .map(|v| {
+            (
+                v.cache_key.clone(),
+                v.hide_community,
+                v.tor_only,
+                v.show_outdated,
+            )
+        })
+        .collect();
+    let render_result = tokio::task::spawn_blocking(move || {
+        let network = SafeNetwork(network_name);
+        let summary = NetworkSummary::new(&servers, &network);
+        let mut rendered = Vec::with_capacity(variants.len());
+        for (cache_key, hide_community, tor_only, show_outdated) in variants {
+            match render_network_status(
+                &servers,
+                &summary,
+                &network,
+                hide_community,
+                tor_only,
+                show_outdated,
+                None, // No operator filter for cache refresh
+                None, // No historical timestamp for cache refresh
+            ) {
+                Ok(html) => rendered.push((cache_key, CacheEntry::new(html))),
+                Err(e) => error!("Failed to refresh cache for {}: {}", cache_key, e),
             }
-            tokio::time::sleep(Duration::from_millis(500)).await;
         }
-    }
+        rendered
+    })
+    .await;
+
+    let rendered = match render_result {
+        Ok(rendered) => rendered,
+        Err(e) => {
+            error!("Render task for {} failed: {}", network_name, e);
+            return;
+        }
+    };
+
+    let rendered_count = rendered.len();
+    let mut cache = worker.cache.write().await;
+    cache.extend(rendered);
+    drop(cache);
 
     info!(
-        "Initial cache population completed in {:?}",
-        cycle_start.elapsed()
+        "Cache refreshed for {} ({} pages) in {:?}",
+        network.0,
+        rendered_count,
+        query_start.elapsed()
     );
+}
 
-    // Then refresh periodically
-    let mut interval = interval(Duration::from_secs(refresh_interval_secs));
-    loop {
-        interval.tick().await;
+/// Refresh every cached page and API response once.
+async fn refresh_cache_cycle(worker: &Worker, variants: &[PageVariant]) {
+    for spec in &NETWORKS {
+        let network = SafeNetwork(spec.name);
+        refresh_network_pages(worker, &network, variants).await;
 
-        info!("Starting cache refresh cycle");
-        let cycle_start = std::time::Instant::now();
+        // Add a small delay between queries to prevent memory spikes
+        tokio::time::sleep(Duration::from_millis(500)).await;
+    }
 
-        for network_str in &networks {
-            for &hide_community in &hide_community_options {
-                for &tor_only in &tor_only_options {
-                    for &show_outdated in &show_outdated_options {
-                        let cache_key = format!(
-                            "{}-{}-{}-{}",
-                            network_str, hide_community, tor_only, show_outdated
-                        );
+    prune_on_demand_cache(&worker.cache).await;
+}
 
-                        if let Some(network) = SafeNetwork::from_str(network_str) {
-                            let query_start = std::time::Instant::now();
-
-                            let result = fetch_and_render_network_status(
-                                &worker,
-                                &network,
-                                hide_community,
-                                tor_only,
-                                show_outdated,
-                                None, // No operator filter for cache refresh
-                                None, // No historical timestamp for cache refresh
-                            )
-                            .await;
-                            match result {
-                                Ok(html) => {
-                                    let mut cache = worker.cache.write().await;
-                                    cache.insert(
-                                        cache_key.clone(),
-                                        CacheEntry {
-                                            html,
-                                            timestamp: std::time::Instant::now(),
-                                        },
-                                    );
-                                    info!(
-                                        "Cache refreshed for {} in {:?}",
-                                        cache_key,
-                                        query_start.elapsed()
-                                    );
-                                }
-                                Err(e) => {
-                                    error!("Failed to refresh cache for {}: {}", cache_key, e);
-                                    // Keep old cache if refresh fails - don't remove it
-                                }
-                            }
+/// Drop expired pages that were rendered on request, so servers and
+/// historical views that are requested once don't accumulate in the cache.
+/// This runs once per refresh cycle rather than on every cache miss, keeping
+/// the full cache scan off the request path.
+async fn prune_on_demand_cache(cache: &PageCache) {
+    cache.write().await.retain(|key, cached| {
+        let on_demand = key.starts_with(SERVER_DETAIL_CACHE_PREFIX)
+            || key.starts_with(DIRECT_VIEW_CACHE_PREFIX);
+        !on_demand || cached.timestamp.elapsed() < ON_DEMAND_CACHE_TTL
+    });
+}
 
-                            // Add a small delay between queries to prevent memory spikes
-                            tokio::time::sleep(Duration::from_millis(500)).await;
-                        } else {
-                            error!("Invalid network: {}", network_str);
-                        }
-                    }
-                }
-            }
-        }
+/// Background task to refresh the cache periodically
+async fn cache_refresh_task(worker: Worker) {
+    // Increase interval to reduce load - env var or default to 20 seconds
+    let refresh_interval_secs = env::var("CACHE_REFRESH_INTERVAL_SECS")
+        .ok()
+        .and_then(|s| s.parse::<u64>().ok())
+        .unwrap_or(20);
 
-        // Refresh API JSON cache for each network
-        for network_str in &networks {
-            if let Some(network) = SafeNetwork::from_str(network_str) {
-                let cache_key = format!("{}-api", network_str);
-                let query_start = std::time::Instant::now();
-
-                match fetch_api_json(&worker, &network, None).await {
-                    Ok(json) => {
-                        let mut cache = worker.cache.write().await;
-                        cache.insert(
-                            cache_key.clone(),
-                            CacheEntry {
-                                html: json,
-                                timestamp: std::time::Instant::now(),
-                            },
-                        );
-                        info!(
-                            "Cache refreshed for {} in {:?}",
-                            cache_key,
-                            query_start.elapsed()
-                        );
-                    }
-                    Err(e) => {
-                        error!("Failed to refresh cache for {}: {}", cache_key, e);
-                        // Keep old cache if refresh fails
-                    }
-                }
-                tokio::time::sleep(Duration::from_millis(500)).await;
-            }
+    // Refresh cache for each network, hide_community, and tor_only combination
+    let variants = page_variants();
+
+    // The first tick completes immediately, so the cache is populated on
+    // startup by the same code path as the periodic refresh. A cycle can
+    // outlast the interval when ClickHouse is slow; delay the next tick
+    // instead of firing the missed ones back to back, so overruns don't turn
+    // into a burst of refreshes.
+    let mut interval = interval(Duration::from_secs(refresh_interval_secs));
+    interval.set_missed_tick_behavior(MissedTickBehavior::Delay);
+    let mut initial = true;
+    loop {
+        interval.tick().await;
+
+        if initial {
+            info!("Initial cache population on startup");
+        } else {
+            info!("Starting cache refresh cycle");
         }
+        let cycle_start = std::time::Instant::now();
+
+        refresh_cache_cycle(&worker, &variants).await;
 
         info!(
-            "Cache refresh cycle completed in {:?}",
+            "{} completed in {:?}",
+            if initial {
+                "Initial cache population"
+            } else {
+                "Cache refresh cycle"
+            },
             cycle_start.elapsed()
         );
+        initial = false;
     }
 }
 
@@ -3817,6 +4352,9 @@ pub async fn run() -> std::io::Result<()> {
     let http_client = reqwest::Client::builder()
         // Hard cap request duration so cache refreshes can't hang forever if ClickHouse stalls
         .timeout(std::time::Duration::from_secs(10))
+        // ClickHouse is on the local network; if it can't accept a connection
+        // quickly, fail instead of spending the whole request timeout on it
+        .connect_timeout(std::time::Duration::from_secs(2))
         .pool_idle_timeout(std::time::Duration::from_secs(300))
         .pool_max_idle_per_host(32)
         .tcp_keepalive(std::time::Duration::from_secs(60))
@@ -3922,26 +4460,18 @@ fn parse_rfc3339_with_nanos(timestamp: &str) -> Option<DateTime<FixedOffset>> {
     // Remove surrounding quotes if present
     let clean_timestamp = timestamp.trim_matches('\'');
 
-    // Handle the specific format: 2025-07-31T21:11:21.472525544Z
-    if let Some(naive_str) = clean_timestamp.strip_suffix('Z') {
-        // Try parsing with different nanosecond formats
-        let formats = [
-            "%Y-%m-%dT%H:%M:%S%.f",
-            "%Y-%m-%dT%H:%M:%S%.9f",
-            "%Y-%m-%dT%H:%M:%S%.6f",
-            "%Y-%m-%dT%H:%M:%S%.3f",
-        ];
-
-        for format in &formats {
-            if let Ok(dt) = chrono::NaiveDateTime::parse_from_str(naive_str, format) {
-                return Some(
-                    DateTime::<Utc>::from_naive_utc_and_offset(dt, Utc)
-                        .with_timezone(&FixedOffset::east_opt(0).unwrap()),
-                );
-            }
-        }
+    // The checkers write RFC3339 with nanoseconds, e.g.
+    // 2025-07-31T21:11:21.472525544Z, which the RFC3339 parser handles
+    // directly without interpreting a format string
+    if let Ok(time) = DateTime::parse_from_rfc3339(clean_timestamp) {
+        return Some(time);
     }
 
-    // Fallback to standard RFC3339 parsing
-    DateTime::parse_from_rfc3339(clean_timestamp).ok()
+    // Otherwise accept a datetime without an offset, such as ClickHouse's
+    // checked_at, and treat it as UTC. %.f also matches a missing fraction.
+    let naive_str = clean_timestamp.strip_suffix('Z').unwrap_or(clean_timestamp);
+    ["%Y-%m-%dT%H:%M:%S%.f", "%Y-%m-%d %H:%M:%S%.f"]
+        .iter()
+        .find_map(|format| chrono::NaiveDateTime::parse_from_str(naive_str, format).ok())
+        .map(|dt| dt.and_utc().fixed_offset())
 }